@@ -2,7 +2,7 @@ import os
 import sys
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, pool, text
 
 from alembic import context
 
@@ -32,6 +32,9 @@ config.set_main_option("sqlalchemy.url", database_url)
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Session-level advisory lock key that serializes migrations across replicas
+MIGRATION_LOCK_KEY = "pilates_alembic_migrations"
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 target_metadata = Base.metadata
@@ -80,10 +83,29 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
+        # Replicas booting together would otherwise race on the same DDL.
+        # A session-level lock (not xact-level) survives the COMMITs issued
+        # by autocommit blocks in individual migrations.
+        use_lock = connection.dialect.name == "postgresql"
+        if use_lock:
+            connection.execute(
+                text("SELECT pg_advisory_lock(hashtext(:key))"),
+                {"key": MIGRATION_LOCK_KEY},
+            )
+            connection.commit()
+
+        try:
+            context.configure(connection=connection, target_metadata=target_metadata)
+
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            if use_lock:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:key))"),
+                    {"key": MIGRATION_LOCK_KEY},
+                )
+                connection.commit()
 
 
 if context.is_offline_mode():
@@ -27,9 +27,11 @@ def upgrade() -> None:
 
 
 def downgrade() -> None:
-    # Remove columns
-    op.drop_column('user_packages', 'reservation_expires_at')
-    op.drop_column('user_packages', 'status')
-    
-    # Drop enum type
-    op.execute("DROP TYPE userpackagestatus")
\ No newline at end of file
+    # Remove both columns under a single lock, then the enum type. IF EXISTS
+    # lets a partially failed downgrade be re-run.
+    op.execute("""
+        ALTER TABLE user_packages
+            DROP COLUMN IF EXISTS reservation_expires_at,
+            DROP COLUMN IF EXISTS status;
+        DROP TYPE IF EXISTS userpackagestatus;
+    """)
\ No newline at end of file
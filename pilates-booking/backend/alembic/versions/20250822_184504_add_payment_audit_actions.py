@@ -17,9 +17,13 @@ depends_on = None
 
 
 def upgrade():
-    # Add new enum values to auditactiontype
-    op.execute("ALTER TYPE auditactiontype ADD VALUE 'APPROVE_PACKAGE_PAYMENT'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE 'REJECT_PACKAGE_PAYMENT'")
+    # Add new enum values to auditactiontype in one autocommit batch rather than
+    # one implicit transaction per value
+    with op.get_context().autocommit_block():
+        op.execute("""
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'APPROVE_PACKAGE_PAYMENT';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'REJECT_PACKAGE_PAYMENT';
+        """)
 
 
 def downgrade():
@@ -19,122 +19,93 @@ depends_on = None
 def upgrade() -> None:
     """Add missing enum values and columns for user packages."""
     
-    # Step 1: Add missing enum values to userpackagepaymentstatus
-    # Each enum addition must be in its own transaction
-    connection = op.get_bind()
-    
-    # Add 'authorized' enum value
-    connection.execute(sa.text("COMMIT"))
-    connection.execute(sa.text("ALTER TYPE userpackagepaymentstatus ADD VALUE IF NOT EXISTS 'authorized'"))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Add 'payment_confirmed' enum value  
-    connection.execute(sa.text("ALTER TYPE userpackagepaymentstatus ADD VALUE IF NOT EXISTS 'payment_confirmed'"))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Step 2: Create approvalstatus enum if it doesn't exist
-    connection.execute(sa.text("""
-        DO $$
-        BEGIN
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'approvalstatus') THEN
-                CREATE TYPE approvalstatus AS ENUM (
-                    'pending',
-                    'in_review', 
-                    'authorized',
-                    'payment_confirmed',
-                    'rejected',
-                    'expired'
-                );
-            END IF;
-        END$$;
-    """))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Add missing values to existing approvalstatus enum
-    connection.execute(sa.text("ALTER TYPE approvalstatus ADD VALUE IF NOT EXISTS 'authorized'"))
-    connection.execute(sa.text("COMMIT"))
-    connection.execute(sa.text("ALTER TYPE approvalstatus ADD VALUE IF NOT EXISTS 'payment_confirmed'"))
-    connection.execute(sa.text("COMMIT"))
+    # Steps 1-2: Add missing enum values and create approvalstatus if needed.
+    # New enum values can't be used until committed, so run them in an
+    # autocommit block instead of issuing manual COMMITs between statements.
+    # PostgreSQL 12+ accepts several ADD VALUE statements in one batch.
+    with op.get_context().autocommit_block():
+        op.execute("""
+            ALTER TYPE userpackagepaymentstatus ADD VALUE IF NOT EXISTS 'authorized';
+            ALTER TYPE userpackagepaymentstatus ADD VALUE IF NOT EXISTS 'payment_confirmed';
+            
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'approvalstatus') THEN
+                    CREATE TYPE approvalstatus AS ENUM (
+                        'pending',
+                        'in_review', 
+                        'authorized',
+                        'payment_confirmed',
+                        'rejected',
+                        'expired'
+                    );
+                END IF;
+            END$$;
+            
+            ALTER TYPE approvalstatus ADD VALUE IF NOT EXISTS 'authorized';
+            ALTER TYPE approvalstatus ADD VALUE IF NOT EXISTS 'payment_confirmed';
+        """)
     
-    # Step 3: Add approval_status column if it doesn't exist
+    # Step 3: Add approval_attempt_count on its own, before anything else
+    # touches the table. With a constant default and no rewriting clause in the
+    # same statement, PostgreSQL 11+ stores the default in the catalog instead
+    # of rewriting every row (this migration already requires 12+, see above).
     op.execute("""
-        DO $$
-        BEGIN
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'approval_status') THEN
-                ALTER TABLE user_packages ADD COLUMN approval_status approvalstatus DEFAULT 'pending' NOT NULL;
-            END IF;
-        END$$;
+        ALTER TABLE user_packages
+            ADD COLUMN IF NOT EXISTS approval_attempt_count INTEGER NOT NULL DEFAULT 0;
     """)
     
-    # Step 4: Add other missing columns that the code expects
+    # Step 4: Add approval_status and the other columns the code expects.
+    # A single ALTER TABLE takes the exclusive lock once instead of per column.
     op.execute("""
-        DO $$
-        BEGIN
-            -- authorized_by column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'authorized_by') THEN
-                ALTER TABLE user_packages ADD COLUMN authorized_by INTEGER REFERENCES users(id);
-            END IF;
-            
-            -- authorized_at column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'authorized_at') THEN
-                ALTER TABLE user_packages ADD COLUMN authorized_at TIMESTAMP WITH TIME ZONE;
-            END IF;
-            
-            -- payment_confirmed_by column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'payment_confirmed_by') THEN
-                ALTER TABLE user_packages ADD COLUMN payment_confirmed_by INTEGER REFERENCES users(id);
-            END IF;
-            
-            -- payment_confirmed_at column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'payment_confirmed_at') THEN
-                ALTER TABLE user_packages ADD COLUMN payment_confirmed_at TIMESTAMP WITH TIME ZONE;
-            END IF;
-            
-            -- payment_confirmation_reference column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'payment_confirmation_reference') THEN
-                ALTER TABLE user_packages ADD COLUMN payment_confirmation_reference VARCHAR;
-            END IF;
-            
-            -- approval_deadline column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'approval_deadline') THEN
-                ALTER TABLE user_packages ADD COLUMN approval_deadline TIMESTAMP WITH TIME ZONE;
-            END IF;
-            
-            -- idempotency_key column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'idempotency_key') THEN
-                ALTER TABLE user_packages ADD COLUMN idempotency_key VARCHAR UNIQUE;
-            END IF;
-            
-            -- last_approval_attempt_at column
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'last_approval_attempt_at') THEN
-                ALTER TABLE user_packages ADD COLUMN last_approval_attempt_at TIMESTAMP WITH TIME ZONE;
-            END IF;
-            
-            -- approval_attempt_count column  
-            IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = 'approval_attempt_count') THEN
-                ALTER TABLE user_packages ADD COLUMN approval_attempt_count INTEGER DEFAULT 0 NOT NULL;
-            END IF;
-        END$$;
+        ALTER TABLE user_packages
+            ADD COLUMN IF NOT EXISTS approval_status approvalstatus DEFAULT 'pending' NOT NULL,
+            ADD COLUMN IF NOT EXISTS authorized_by INTEGER REFERENCES users(id),
+            ADD COLUMN IF NOT EXISTS authorized_at TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS payment_confirmed_by INTEGER REFERENCES users(id),
+            ADD COLUMN IF NOT EXISTS payment_confirmed_at TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS payment_confirmation_reference VARCHAR,
+            ADD COLUMN IF NOT EXISTS approval_deadline TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR,
+            ADD COLUMN IF NOT EXISTS last_approval_attempt_at TIMESTAMP WITH TIME ZONE;
     """)
     
     # Step 5: Update existing data to use the new enum values
-    # Now the enum values are committed and can be safely used
+    # Now the enum values are committed and can be safely used. Both columns
+    # are rewritten in a single pass; the CASE sees the pre-update
+    # payment_status, so 'approved' maps straight to 'payment_confirmed'.
     op.execute("""
         UPDATE user_packages 
-        SET payment_status = 'payment_confirmed'
-        WHERE payment_status = 'approved';
+        SET payment_status = (CASE
+                WHEN payment_status = 'approved' THEN 'payment_confirmed'
+                ELSE payment_status::text
+            END)::userpackagepaymentstatus,
+            approval_status = (CASE 
+                WHEN payment_status = 'pending_approval' THEN 'pending'
+                WHEN payment_status = 'rejected' THEN 'rejected'
+                WHEN payment_status IN ('payment_confirmed', 'approved') THEN 'payment_confirmed'
+                WHEN payment_status = 'authorized' THEN 'authorized'
+                ELSE 'pending'
+            END)::approvalstatus;
     """)
     
-    op.execute("""
-        UPDATE user_packages 
-        SET approval_status = (CASE 
-            WHEN payment_status = 'pending_approval' THEN 'pending'
-            WHEN payment_status = 'rejected' THEN 'rejected'
-            WHEN payment_status = 'payment_confirmed' THEN 'payment_confirmed'
-            WHEN payment_status = 'authorized' THEN 'authorized'
-            ELSE 'pending'
-        END)::approvalstatus;
-    """)
+    # Step 6: Enforce idempotency_key uniqueness. An inline UNIQUE would build
+    # the index under the ALTER TABLE's exclusive lock, so build it
+    # concurrently and attach the constraint to the finished index instead.
+    has_constraint = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_constraint WHERE conname = 'uq_user_packages_idempotency_key'"
+    )).scalar()
+    if not has_constraint:
+        with op.get_context().autocommit_block():
+            op.execute("""
+                CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_user_packages_idempotency_key
+                ON user_packages (idempotency_key);
+            """)
+        op.execute("""
+            ALTER TABLE user_packages
+                ADD CONSTRAINT uq_user_packages_idempotency_key
+                UNIQUE USING INDEX uq_user_packages_idempotency_key;
+        """)
 
 
 def downgrade() -> None:
@@ -154,15 +125,10 @@ def downgrade() -> None:
         'approval_status'
     ]
     
-    for column in columns_to_remove:
-        op.execute(f"""
-            DO $$
-            BEGIN
-                IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = '{column}') THEN
-                    ALTER TABLE user_packages DROP COLUMN {column};
-                END IF;
-            END$$;
-        """)
+    op.execute(
+        "ALTER TABLE user_packages "
+        + ", ".join(f"DROP COLUMN IF EXISTS {column}" for column in columns_to_remove)
+    )
     
     # Note: We can't easily remove enum values in PostgreSQL, so we leave them
     # This is generally acceptable as they don't cause harm
@@ -19,81 +19,38 @@ depends_on = None
 def upgrade() -> None:
     """Simplify package approval flow."""
     
-    connection = op.get_bind()
-    
-    # Step 1: First, add temporary columns to store the new values
-    op.add_column('user_packages', sa.Column('payment_status_temp', sa.String(50)))
-    op.add_column('user_packages', sa.Column('status_temp', sa.String(50)))
-    
-    # Step 2: Update temporary columns with simplified values  
-    op.execute("""
-        UPDATE user_packages 
-        SET payment_status_temp = (CASE 
-            WHEN payment_status::text = 'pending_approval' THEN 'pending'
-            WHEN payment_status::text = 'authorized' THEN 'pending'
-            WHEN payment_status::text = 'payment_confirmed' THEN 'confirmed'
-            WHEN payment_status::text = 'approved' THEN 'confirmed'
-            WHEN payment_status::text = 'rejected' THEN 'rejected'
-            ELSE 'confirmed'
-        END);
-    """)
-    
-    # Update user package status - remove RESERVED status
+    # Step 1: Convert status columns from native enums to VARCHAR + CHECK.
+    # The two-step approval values are remapped in the same rewrite, so the
+    # table is scanned once and no enum type swap (with its implicit COMMITs)
+    # is needed. Future value changes become a transactional constraint swap.
     op.execute("""
-        UPDATE user_packages 
-        SET status_temp = (CASE 
-            WHEN status::text = 'reserved' THEN 'active'
-            WHEN status::text = 'active' THEN 'active'
-            WHEN status::text = 'expired' THEN 'expired'
-            WHEN status::text = 'cancelled' THEN 'cancelled'
-            ELSE 'active'
-        END);
+        ALTER TABLE user_packages
+            ALTER COLUMN payment_status DROP DEFAULT,
+            ALTER COLUMN status DROP DEFAULT,
+            ALTER COLUMN payment_status TYPE VARCHAR(32) USING (CASE payment_status::text
+                WHEN 'pending_approval' THEN 'pending'
+                WHEN 'authorized' THEN 'pending'
+                WHEN 'payment_confirmed' THEN 'confirmed'
+                WHEN 'approved' THEN 'confirmed'
+                WHEN 'rejected' THEN 'rejected'
+                ELSE 'confirmed'
+            END),
+            ALTER COLUMN status TYPE VARCHAR(32) USING (CASE status::text
+                WHEN 'reserved' THEN 'active'
+                WHEN 'active' THEN 'active'
+                WHEN 'expired' THEN 'expired'
+                WHEN 'cancelled' THEN 'cancelled'
+                ELSE 'active'
+            END),
+            ALTER COLUMN payment_status SET DEFAULT 'confirmed',
+            ALTER COLUMN status SET DEFAULT 'active',
+            ADD CONSTRAINT ck_user_packages_payment_status
+                CHECK (payment_status IN ('pending', 'confirmed', 'rejected')),
+            ADD CONSTRAINT ck_user_packages_status
+                CHECK (status IN ('active', 'expired', 'cancelled'));
     """)
     
-    # Step 2: Create new simplified enums
-    
-    # Create new payment status enum with simplified values
-    connection.execute(sa.text("COMMIT"))
-    connection.execute(sa.text("""
-        CREATE TYPE userpackagepaymentstatus_new AS ENUM ('pending', 'confirmed', 'rejected');
-    """))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Create new user package status enum without RESERVED
-    connection.execute(sa.text("""
-        CREATE TYPE userpackagestatus_new AS ENUM ('active', 'expired', 'cancelled');
-    """))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Step 3: Drop old columns and rename temp columns
-    op.drop_column('user_packages', 'payment_status')
-    op.drop_column('user_packages', 'status')
-    
-    # Add new columns with new enum types
-    op.add_column('user_packages', sa.Column('payment_status', sa.Enum('pending', 'confirmed', 'rejected', name='userpackagepaymentstatus_new'), nullable=False, server_default='confirmed'))
-    op.add_column('user_packages', sa.Column('status', sa.Enum('active', 'expired', 'cancelled', name='userpackagestatus_new'), nullable=False, server_default='active'))
-    
-    # Step 4: Copy data from temp columns to new columns
-    op.execute("""
-        UPDATE user_packages 
-        SET payment_status = payment_status_temp::userpackagepaymentstatus_new,
-            status = status_temp::userpackagestatus_new;
-    """)
-    
-    # Step 5: Drop temp columns
-    op.drop_column('user_packages', 'payment_status_temp')
-    op.drop_column('user_packages', 'status_temp')
-    
-    # Step 6: Drop old enums and rename new ones
-    connection.execute(sa.text("DROP TYPE userpackagepaymentstatus CASCADE"))
-    connection.execute(sa.text("ALTER TYPE userpackagepaymentstatus_new RENAME TO userpackagepaymentstatus"))
-    connection.execute(sa.text("COMMIT"))
-    
-    connection.execute(sa.text("DROP TYPE userpackagestatus CASCADE"))
-    connection.execute(sa.text("ALTER TYPE userpackagestatus_new RENAME TO userpackagestatus"))  
-    connection.execute(sa.text("COMMIT"))
-    
-    # Step 5: Remove complex approval columns that are no longer needed
+    # Step 2: Remove complex approval columns that are no longer needed
     columns_to_remove = [
         'authorized_by',
         'authorized_at', 
@@ -109,95 +66,49 @@ def upgrade() -> None:
         'reservation_expires_at'
     ]
     
-    for column in columns_to_remove:
-        op.execute(f"""
-            DO $$
-            BEGIN
-                IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'user_packages' AND column_name = '{column}') THEN
-                    ALTER TABLE user_packages DROP COLUMN {column};
-                END IF;
-            END$$;
-        """)
+    op.execute(
+        "ALTER TABLE user_packages "
+        + ", ".join(f"DROP COLUMN IF EXISTS {column}" for column in columns_to_remove)
+    )
     
-    # Step 6: Drop the approvalstatus enum if it exists (no longer needed)
-    connection.execute(sa.text("COMMIT"))
-    connection.execute(sa.text("""
-        DO $$
-        BEGIN
-            IF EXISTS (SELECT 1 FROM pg_type WHERE typname = 'approvalstatus') THEN
-                DROP TYPE approvalstatus CASCADE;
-            END IF;
-        END$$;
-    """))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Step 7: Update payment_status default to 'confirmed' (was 'pending_approval')
-    op.execute("""
-        ALTER TABLE user_packages 
-        ALTER COLUMN payment_status SET DEFAULT 'confirmed';
-    """)
+    # Step 3: Drop the enum types now that no columns reference them
+    op.execute("DROP TYPE IF EXISTS userpackagepaymentstatus, userpackagestatus, approvalstatus")
 
 
 def downgrade() -> None:
     """Reverse the simplification changes."""
     
-    connection = op.get_bind()
-    
-    # Step 1: Recreate old complex enums
-    connection.execute(sa.text("COMMIT"))
-    connection.execute(sa.text("""
-        CREATE TYPE userpackagepaymentstatus_old AS ENUM (
+    # Step 1: Recreate old complex enums. Types created inside the migration
+    # transaction are usable immediately, so no intermediate COMMITs are needed.
+    op.execute("""
+        CREATE TYPE userpackagepaymentstatus AS ENUM (
             'pending_approval', 'authorized', 'payment_confirmed', 'approved', 'rejected'
         );
-    """))
-    connection.execute(sa.text("COMMIT"))
-    
-    connection.execute(sa.text("""
-        CREATE TYPE userpackagestatus_old AS ENUM ('active', 'reserved', 'expired', 'cancelled');
-    """))
-    connection.execute(sa.text("COMMIT"))
-    
-    connection.execute(sa.text("""
+        CREATE TYPE userpackagestatus AS ENUM ('active', 'reserved', 'expired', 'cancelled');
         CREATE TYPE approvalstatus AS ENUM (
             'pending', 'in_review', 'authorized', 'payment_confirmed', 'rejected', 'expired'
         );
-    """))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Step 2: Update data back to old format
-    op.execute("""
-        UPDATE user_packages 
-        SET payment_status = (CASE 
-            WHEN payment_status = 'pending' THEN 'pending_approval'
-            WHEN payment_status = 'confirmed' THEN 'payment_confirmed'
-            WHEN payment_status = 'rejected' THEN 'rejected'
-            ELSE 'pending_approval'
-        END)::text;
     """)
     
-    # Step 3: Update columns to use old enums
+    # Step 2: Convert the VARCHAR columns back to the old enums in one rewrite
     op.execute("""
-        ALTER TABLE user_packages 
-        ALTER COLUMN payment_status TYPE userpackagepaymentstatus_old 
-        USING payment_status::text::userpackagepaymentstatus_old;
+        ALTER TABLE user_packages
+            DROP CONSTRAINT IF EXISTS ck_user_packages_payment_status,
+            DROP CONSTRAINT IF EXISTS ck_user_packages_status,
+            ALTER COLUMN payment_status DROP DEFAULT,
+            ALTER COLUMN status DROP DEFAULT,
+            ALTER COLUMN payment_status TYPE userpackagepaymentstatus USING (CASE payment_status
+                WHEN 'pending' THEN 'pending_approval'
+                WHEN 'confirmed' THEN 'payment_confirmed'
+                WHEN 'rejected' THEN 'rejected'
+                ELSE 'pending_approval'
+            END)::userpackagepaymentstatus,
+            ALTER COLUMN status TYPE userpackagestatus USING status::userpackagestatus,
+            ALTER COLUMN payment_status SET DEFAULT 'pending_approval',
+            ALTER COLUMN status SET DEFAULT 'active';
     """)
     
-    op.execute("""
-        ALTER TABLE user_packages 
-        ALTER COLUMN status TYPE userpackagestatus_old 
-        USING status::text::userpackagestatus_old;
-    """)
-    
-    # Step 4: Drop new enums and rename old ones back
-    connection.execute(sa.text("DROP TYPE userpackagepaymentstatus CASCADE"))
-    connection.execute(sa.text("ALTER TYPE userpackagepaymentstatus_old RENAME TO userpackagepaymentstatus"))
-    connection.execute(sa.text("COMMIT"))
-    
-    connection.execute(sa.text("DROP TYPE userpackagestatus CASCADE"))  
-    connection.execute(sa.text("ALTER TYPE userpackagestatus_old RENAME TO userpackagestatus"))
-    connection.execute(sa.text("COMMIT"))
-    
-    # Step 5: Re-add the removed columns
+    # Step 3: Re-add the removed columns
     op.execute("""
         DO $$
         BEGIN
@@ -251,9 +162,4 @@ def downgrade() -> None:
             END IF;
         END$$;
     """)
-    
-    # Step 6: Reset payment_status default
-    op.execute("""
-        ALTER TABLE user_packages 
-        ALTER COLUMN payment_status SET DEFAULT 'pending_approval';
-    """)
\ No newline at end of file
+
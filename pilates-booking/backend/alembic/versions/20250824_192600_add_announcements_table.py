@@ -34,19 +34,29 @@ def upgrade():
         sa.PrimaryKeyConstraint('id'),
     )
     
-    # Create indexes
-    op.create_index(op.f('ix_announcements_id'), 'announcements', ['id'])
-    op.create_index(op.f('ix_announcements_is_active'), 'announcements', ['is_active'])
-    op.create_index(op.f('ix_announcements_created_at'), 'announcements', ['created_at'])
-    op.create_index(op.f('ix_announcements_expires_at'), 'announcements', ['expires_at'])
+    # Create indexes concurrently (outside the migration transaction) so a
+    # re-run against a populated table doesn't block writes
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_announcements_id'), 'announcements', ['id'], postgresql_concurrently=True, if_not_exists=True)
+        # Partial index matching the visible-announcements query (active, not
+        # deleted, newest first); replaces separate is_active/created_at/
+        # expires_at indexes that the planner had to bitmap-AND and re-sort
+        op.create_index(
+            'ix_announcements_visible',
+            'announcements',
+            [sa.text('created_at DESC')],
+            postgresql_include=['expires_at'],
+            postgresql_where=sa.text('is_active = true AND deleted_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
 
 
 def downgrade():
     # Drop indexes
-    op.drop_index(op.f('ix_announcements_expires_at'), table_name='announcements')
-    op.drop_index(op.f('ix_announcements_created_at'), table_name='announcements')
-    op.drop_index(op.f('ix_announcements_is_active'), table_name='announcements')
-    op.drop_index(op.f('ix_announcements_id'), table_name='announcements')
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_announcements_visible', table_name='announcements', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_announcements_id'), table_name='announcements', postgresql_concurrently=True, if_exists=True)
     
     # Drop table
     op.drop_table('announcements')
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""add_package_version_column
+
+Revision ID: 20250825_090000
+Revises: 20250824_192600
+Create Date: 2025-08-25 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250825_090000'
+down_revision = '20250824_192600'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Add version column to packages for optimistic locking
+    op.add_column('packages', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('packages', 'version')
@@ -0,0 +1,27 @@
+"""add_package_idempotency_key
+
+Revision ID: 20250825_093000
+Revises: 20250825_090000
+Create Date: 2025-08-25 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250825_093000'
+down_revision = '20250825_090000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Hash of the client's Idempotency-Key so retried creates return the original row
+    op.add_column('packages', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_unique_constraint('uq_packages_idempotency_key', 'packages', ['idempotency_key'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_packages_idempotency_key', 'packages', type_='unique')
+    op.drop_column('packages', 'idempotency_key')
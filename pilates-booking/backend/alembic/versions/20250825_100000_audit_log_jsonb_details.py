@@ -0,0 +1,63 @@
+"""audit_log_jsonb_details
+
+Revision ID: 20250825_100000
+Revises: 20250825_093000
+Create Date: 2025-08-25 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20250825_100000'
+down_revision = '20250825_093000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # jsonb supports containment queries and GIN indexing; json does not
+    op.alter_column(
+        'audit_logs',
+        'details',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using='details::jsonb',
+    )
+
+    # Build indexes concurrently so audit writes aren't blocked
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_audit_logs_details',
+            'audit_logs',
+            ['details'],
+            postgresql_using='gin',
+            postgresql_ops={'details': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_audit_logs_resource_timestamp',
+            'audit_logs',
+            ['resource_type', 'resource_id', sa.text('"timestamp" DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_audit_logs_resource_timestamp', 'audit_logs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_audit_logs_details', 'audit_logs', postgresql_concurrently=True, if_exists=True)
+
+    op.alter_column(
+        'audit_logs',
+        'details',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='details::json',
+    )
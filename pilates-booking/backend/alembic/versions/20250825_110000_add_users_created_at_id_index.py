@@ -0,0 +1,33 @@
+"""add_users_created_at_id_index
+
+Revision ID: 20250825_110000
+Revises: 20250825_100000
+Create Date: 2025-08-25 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250825_110000'
+down_revision = '20250825_100000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Supports keyset pagination of the admin user list without locking users
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_created_at_id',
+            'users',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_created_at_id', 'users', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,34 @@
+"""add_users_search_trgm_index
+
+Revision ID: 20250825_120000
+Revises: 20250825_110000
+Create Date: 2025-08-25 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20250825_120000'
+down_revision = '20250825_110000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Trigram index so the admin user search (LIKE '%q%') doesn't scan users.
+    # The expression must match AdminService's search expression exactly.
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_search_trgm
+            ON users USING gin (
+                lower(email || ' ' || first_name || ' ' || last_name) gin_trgm_ops
+            )
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_search_trgm")
@@ -0,0 +1,33 @@
+"""add_payments_user_package_index
+
+Revision ID: 20250825_130000
+Revises: 20250825_120000
+Create Date: 2025-08-25 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20250825_130000'
+down_revision = '20250825_120000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # payments.user_package_id had no index; cash confirmation looks payments
+    # up by package, method and status
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_payments_user_package_method_status',
+            'payments',
+            ['user_package_id', 'payment_method', 'status'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_payments_user_package_method_status', 'payments', postgresql_concurrently=True, if_exists=True)
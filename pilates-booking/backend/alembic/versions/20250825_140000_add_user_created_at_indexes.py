@@ -0,0 +1,42 @@
+"""add_user_created_at_indexes
+
+Revision ID: 20250825_140000
+Revises: 20250825_130000
+Create Date: 2025-08-25 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250825_140000'
+down_revision = '20250825_130000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Per-user booking and package listings filter on user_id and order by
+    # created_at desc; serve both straight from the index without a sort
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_user_created',
+            'bookings',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_user_packages_user_created',
+            'user_packages',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_packages_user_created', 'user_packages', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_bookings_user_created', 'bookings', postgresql_concurrently=True, if_exists=True)
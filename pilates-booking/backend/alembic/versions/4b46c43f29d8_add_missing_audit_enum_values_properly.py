@@ -17,15 +17,19 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Add missing enum values to auditactiontype
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'UPDATE_USER'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'DEACTIVATE_USER'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'UPDATE_PACKAGE'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'CREATE_PACKAGE'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'DELETE_PACKAGE'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'DATA_ACCESS'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'BOOKING_CREATE'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'BOOKING_CANCEL'")
+    # Add missing enum values to auditactiontype in one autocommit batch rather than
+    # one implicit transaction per value
+    with op.get_context().autocommit_block():
+        op.execute("""
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'UPDATE_USER';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'DEACTIVATE_USER';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'UPDATE_PACKAGE';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'CREATE_PACKAGE';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'DELETE_PACKAGE';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'DATA_ACCESS';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'BOOKING_CREATE';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'BOOKING_CANCEL';
+        """)
 
 
 def downgrade() -> None:
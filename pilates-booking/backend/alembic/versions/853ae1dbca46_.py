@@ -25,8 +25,7 @@ def upgrade() -> None:
     op.add_column('user_packages', sa.Column('payment_confirmed_by', sa.Integer(), nullable=True))
     op.add_column('user_packages', sa.Column('payment_confirmed_at', sa.DateTime(timezone=True), nullable=True))
     op.add_column('user_packages', sa.Column('payment_confirmation_reference', sa.String(), nullable=True))
-    op.drop_index('idx_user_packages_approval_deadline', table_name='user_packages')
-    op.drop_index('idx_user_packages_approval_status', table_name='user_packages')
+    op.drop_index('idx_user_packages_pending_deadline', table_name='user_packages')
     op.drop_index('idx_user_packages_payment_status_approval', table_name='user_packages')
     op.create_foreign_key(op.f('fk_user_packages_payment_confirmed_by_users'), 'user_packages', 'users', ['payment_confirmed_by'], ['id'])
     op.create_foreign_key(op.f('fk_user_packages_authorized_by_users'), 'user_packages', 'users', ['authorized_by'], ['id'])
@@ -37,9 +36,8 @@ def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_constraint(op.f('fk_user_packages_authorized_by_users'), 'user_packages', type_='foreignkey')
     op.drop_constraint(op.f('fk_user_packages_payment_confirmed_by_users'), 'user_packages', type_='foreignkey')
-    op.create_index('idx_user_packages_payment_status_approval', 'user_packages', ['payment_status', 'approval_status'], unique=False)
-    op.create_index('idx_user_packages_approval_status', 'user_packages', ['approval_status'], unique=False)
-    op.create_index('idx_user_packages_approval_deadline', 'user_packages', ['approval_deadline'], unique=False)
+    op.create_index('idx_user_packages_payment_status_approval', 'user_packages', ['approval_status', 'payment_status'], unique=False)
+    op.create_index('idx_user_packages_pending_deadline', 'user_packages', ['approval_deadline'], unique=False, postgresql_where=sa.text("approval_status = 'pending'"))
     op.drop_column('user_packages', 'payment_confirmation_reference')
     op.drop_column('user_packages', 'payment_confirmed_at')
     op.drop_column('user_packages', 'payment_confirmed_by')
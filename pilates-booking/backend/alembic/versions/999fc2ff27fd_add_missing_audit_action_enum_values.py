@@ -17,10 +17,14 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Add missing enum values to auditactiontype enum
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'AUTHORIZE_PACKAGE_PAYMENT'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'CONFIRM_PACKAGE_PAYMENT'")
-    op.execute("ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'REVOKE_PACKAGE_AUTHORIZATION'")
+    # Add missing enum values to auditactiontype enum in one autocommit batch rather than
+    # one implicit transaction per value
+    with op.get_context().autocommit_block():
+        op.execute("""
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'AUTHORIZE_PACKAGE_PAYMENT';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'CONFIRM_PACKAGE_PAYMENT';
+            ALTER TYPE auditactiontype ADD VALUE IF NOT EXISTS 'REVOKE_PACKAGE_AUTHORIZATION';
+        """)
 
 
 def downgrade() -> None:
@@ -20,66 +20,35 @@ depends_on = None
 def upgrade():
     """Add security enhancements to package approval system."""
     
-    # Add new enum type for approval status (defensive creation)
+    # Add the approval status enum, the new user_packages and payment_approvals
+    # columns and the idempotency constraint in one round-trip. Each table gets
+    # a single ALTER TABLE (one lock acquisition) with IF NOT EXISTS clauses in
+    # place of per-column duplicate_column handlers.
     op.execute("""
         DO $$ BEGIN
             CREATE TYPE approvalstatus AS ENUM ('pending', 'in_review', 'approved', 'rejected', 'expired');
         EXCEPTION
             WHEN duplicate_object THEN null;
         END $$;
-    """)
-    
-    # Add new columns to user_packages table for security and audit (with defensive checks)
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE user_packages ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE user_packages ADD COLUMN approval_deadline TIMESTAMP WITH TIME ZONE;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE user_packages ADD COLUMN approval_status approvalstatus NOT NULL DEFAULT 'pending';
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE user_packages ADD COLUMN idempotency_key VARCHAR;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE user_packages ADD COLUMN last_approval_attempt_at TIMESTAMP WITH TIME ZONE;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE user_packages ADD COLUMN approval_attempt_count INTEGER NOT NULL DEFAULT 0;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    # Add unique constraint on idempotency_key (defensive)
-    op.execute("""
+        
+        ALTER TABLE user_packages
+            ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1,
+            ADD COLUMN IF NOT EXISTS approval_deadline TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS approval_status approvalstatus NOT NULL DEFAULT 'pending',
+            ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR,
+            ADD COLUMN IF NOT EXISTS last_approval_attempt_at TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS approval_attempt_count INTEGER NOT NULL DEFAULT 0;
+        
+        ALTER TABLE payment_approvals
+            ADD COLUMN IF NOT EXISTS package_version_at_approval INTEGER,
+            ADD COLUMN IF NOT EXISTS failure_reason TEXT,
+            ADD COLUMN IF NOT EXISTS ip_address VARCHAR(45),
+            ADD COLUMN IF NOT EXISTS user_agent TEXT,
+            ADD COLUMN IF NOT EXISTS previous_status VARCHAR,
+            ADD COLUMN IF NOT EXISTS approval_duration_seconds INTEGER,
+            ADD COLUMN IF NOT EXISTS is_bulk_operation BOOLEAN NOT NULL DEFAULT FALSE,
+            ADD COLUMN IF NOT EXISTS bulk_operation_id VARCHAR;
+        
         DO $$ BEGIN
             ALTER TABLE user_packages ADD CONSTRAINT uq_user_packages_idempotency_key UNIQUE (idempotency_key);
         EXCEPTION
@@ -90,107 +59,45 @@ def upgrade():
     # Update default payment_status to PENDING_APPROVAL for existing records
     op.execute("UPDATE user_packages SET payment_status = 'pending_approval' WHERE payment_status = 'approved' AND status = 'reserved'")
     
-    # Add enhanced audit fields to payment_approvals table (with defensive checks)
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN package_version_at_approval INTEGER;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN failure_reason TEXT;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN ip_address VARCHAR(45);
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN user_agent TEXT;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN previous_status VARCHAR;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN approval_duration_seconds INTEGER;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN is_bulk_operation BOOLEAN NOT NULL DEFAULT FALSE;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    op.execute("""
-        DO $$ BEGIN
-            ALTER TABLE payment_approvals ADD COLUMN bulk_operation_id VARCHAR;
-        EXCEPTION
-            WHEN duplicate_column THEN null;
-        END $$;
-    """)
-    
-    # Create indexes for performance (defensive creation)
-    op.execute("""
-        CREATE INDEX IF NOT EXISTS idx_user_packages_approval_status 
-        ON user_packages (approval_status)
-    """)
-    
-    op.execute("""
-        CREATE INDEX IF NOT EXISTS idx_user_packages_payment_status_approval 
-        ON user_packages (payment_status, approval_status)
-    """)
-    
-    op.execute("""
-        CREATE INDEX IF NOT EXISTS idx_user_packages_approval_deadline 
-        ON user_packages (approval_deadline)
-    """)
-    
-    op.execute("""
-        CREATE INDEX IF NOT EXISTS idx_payment_approvals_ip_address 
-        ON payment_approvals (ip_address)
-    """)
-    
-    op.execute("""
-        CREATE INDEX IF NOT EXISTS idx_payment_approvals_bulk_operation 
-        ON payment_approvals (bulk_operation_id)
-    """)
+    # Create indexes for performance (defensive creation). CONCURRENTLY keeps
+    # user_packages/payment_approvals writable during the build; it can't run
+    # in a transaction or a multi-statement batch, hence one execute per index.
+    with op.get_context().autocommit_block():
+        # Leads with approval_status so it also serves approval_status-only
+        # lookups without a separate single-column index
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_packages_payment_status_approval 
+            ON user_packages (approval_status, payment_status)
+        """)
+        
+        # Deadlines are only checked for pending approvals; a partial index
+        # stays proportional to the pending backlog, not the whole table
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_packages_pending_deadline 
+            ON user_packages (approval_deadline)
+            WHERE approval_status = 'pending'
+        """)
+        
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payment_approvals_ip_address 
+            ON payment_approvals (ip_address)
+        """)
+        
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payment_approvals_bulk_operation 
+            ON payment_approvals (bulk_operation_id)
+        """)
 
 
 def downgrade():
     """Rollback security enhancements."""
     
     # Drop indexes
-    op.drop_index('idx_payment_approvals_bulk_operation')
-    op.drop_index('idx_payment_approvals_ip_address')
-    op.drop_index('idx_user_packages_approval_deadline')
-    op.drop_index('idx_user_packages_payment_status_approval')
-    op.drop_index('idx_user_packages_approval_status')
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_payment_approvals_bulk_operation', table_name='payment_approvals', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_payment_approvals_ip_address', table_name='payment_approvals', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_user_packages_pending_deadline', table_name='user_packages', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_user_packages_payment_status_approval', table_name='user_packages', postgresql_concurrently=True, if_exists=True)
     
     # Remove audit fields from payment_approvals
     op.drop_column('payment_approvals', 'bulk_operation_id')
@@ -1,16 +1,21 @@
-from typing import Generator, List, Optional
+from typing import Any, Dict, Generator, List, Optional
 
 import redis.asyncio as redis
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, make_transient_to_detached
 
+from ...core.cache import (CacheKeys, cache, get_local_auth_user,
+                           set_local_auth_user)
 from ...core.config import settings
 from ...core.database import AsyncSessionLocal
 from ...core.logging import auth_logger, db_logger
 from ...core.security import verify_token
+from ...models.package import Package
 from ...models.user import User, UserRole
+from ...services.admin_service import AdminService
 
 security = HTTPBearer()
 
@@ -27,9 +32,98 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+# Shared across requests so every caller reuses one connection pool
+_redis_client: Optional[redis.Redis] = None
+
+
 async def get_redis() -> redis.Redis:
     """Redis dependency."""
-    return redis.from_url(settings.REDIS_URL, encoding="utf8", decode_responses=True)
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(
+            settings.REDIS_URL, encoding="utf8", decode_responses=True
+        )
+    return _redis_client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client and its connection pool."""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.close()
+        _redis_client = None
+
+
+# Credentials are never loaded for the auth path; nothing on the request path
+# reads them from current_user
+_AUTH_CREDENTIAL_COLUMNS = ("hashed_password", "verification_token", "reset_token")
+
+
+def _auth_snapshot(user: User) -> Dict[str, Any]:
+    """The identity fields cached for authentication, as plain JSON values."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "role": user.role.value,
+        "is_active": user.is_active,
+        "is_verified": user.is_verified,
+    }
+
+
+def _user_from_auth_snapshot(snapshot: Dict[str, Any]) -> User:
+    """Rebuild a detached User from a cached snapshot.
+
+    Only the identity fields are set; the other columns stay unloaded, see
+    get_current_user_with_profile.
+    """
+    user = User(
+        id=int(snapshot["id"]),
+        email=str(snapshot["email"]),
+        role=UserRole(snapshot["role"]),
+        is_active=bool(snapshot["is_active"]),
+        is_verified=bool(snapshot["is_verified"]),
+    )
+    make_transient_to_detached(user)
+    return user
+
+
+async def _load_auth_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """Load the user for a token, serving repeat requests from cache.
+
+    The worker's own copy is checked first, then Redis. A cache hit is
+    attached to the session as a persistent instance without a SELECT, so
+    endpoints can still modify and commit current_user.
+    """
+    cache_key = CacheKeys.auth_user(user_id)
+    snapshot = get_local_auth_user(user_id)
+    if snapshot is None:
+        snapshot = await cache.get(cache_key)
+        if snapshot is not None:
+            set_local_auth_user(user_id, snapshot)
+
+    if snapshot is not None:
+        try:
+            user = _user_from_auth_snapshot(snapshot)
+        except (KeyError, TypeError, ValueError):
+            # Unreadable entry; reload it from the database below
+            pass
+        else:
+            return await db.merge(user, load=False)
+
+    stmt = (
+        select(User)
+        .options(*(defer(getattr(User, key)) for key in _AUTH_CREDENTIAL_COLUMNS))
+        .where(User.id == user_id)
+    )
+    result = await db.execute(stmt)
+    user = result.scalar_one_or_none()
+
+    if user is not None:
+        snapshot = _auth_snapshot(user)
+        set_local_auth_user(user_id, snapshot)
+        await cache.set(cache_key, snapshot, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+    return user
 
 
 async def get_current_user(
@@ -50,16 +144,7 @@ async def get_current_user(
         auth_logger.warning("Authentication failed - Invalid token")
         raise credentials_exception
 
-    # Use selectinload to preload relationships and avoid lazy loading issues
-    from sqlalchemy.orm import selectinload
-    
-    stmt = (
-        select(User)
-        .options(selectinload(User.user_packages))
-        .where(User.id == int(user_id))
-    )
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await _load_auth_user(db, user_id)
 
     if user is None:
         auth_logger.warning(f"Authentication failed - User not found: {user_id}")
@@ -86,6 +171,26 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_user_with_profile(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Current active user with the profile columns loaded as well.
+
+    Authentication only restores the identity fields from cache; endpoints
+    that read names, Stripe ids, timestamps and the like depend on this.
+    """
+    unloaded = inspect(current_user).unloaded
+    unloaded_columns = [
+        column.key
+        for column in User.__table__.columns
+        if column.key in unloaded and column.key not in _AUTH_CREDENTIAL_COLUMNS
+    ]
+    if unloaded_columns:
+        await db.refresh(current_user, attribute_names=unloaded_columns)
+    return current_user
+
+
 def require_roles(*allowed_roles: UserRole):
     """Dependency factory for role-based access control."""
 
@@ -151,3 +256,31 @@ def require_instructor_for_class():
         )
 
     return check_instructor_access
+
+
+async def get_package_or_404(
+    package_id: int, db: AsyncSession = Depends(get_db)
+) -> Package:
+    """Load the package from the path or raise 404."""
+    package = await db.get(Package, package_id)
+    if package is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Package not found"
+        )
+    return package
+
+
+async def get_admin_service(db: AsyncSession = Depends(get_db)) -> AdminService:
+    """AdminService dependency, shared by everything in one request.
+
+    Audit entries queued during the request are written after the endpoint
+    returns, so they cost one INSERT instead of a commit per action.
+    """
+    admin_service = AdminService(db)
+    yield admin_service
+
+    try:
+        await admin_service.flush_audit_logs()
+    except Exception as e:
+        await db.rollback()
+        db_logger.error(f"Failed to write admin audit log: {str(e)}")
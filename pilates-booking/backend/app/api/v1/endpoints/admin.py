@@ -1,77 +1,160 @@
+import base64
+import hashlib
+import json
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from sqlalchemy import and_, func, select
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import (APIRouter, Depends, Header, HTTPException, Query, Request,
+                     Response, status)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, func, lambda_stmt, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ....api.v1.deps import get_admin_user, get_db
+from ....api.v1.deps import (get_admin_service, get_admin_user, get_db,
+                             get_package_or_404)
+from ....core.cache import (invalidate_admin_approval_stats_cache,
+                            invalidate_admin_dashboard_cache)
+from ....core.database import strict_loading_options
+from ....core.security import hash_token
 from ....models.package import Package, UserPackage, UserPackageStatus, PaymentStatus
 from ....models.payment import Payment, PaymentMethod
 from ....models.payment import PaymentStatus as PaymentPaymentStatus
 from ....models.user import User, UserRole
-from ....schemas.admin import (AttendanceReport, DashboardAnalytics,
-                               PackageCreate, PackageUpdate, RevenueReport,
-                               UserListResponse, UserUpdate)
+from ....schemas.admin import (AdminUserPackageResponse, AttendanceReport,
+                               AuditLogRead, DashboardAnalytics, PackageCreate,
+                               PackageUpdate, RevenueReport, UserListResponse,
+                               UserUpdate)
 from ....schemas.user import (CreateAnnouncementRequest, Announcement,
                               DashboardMetrics)
-from ....schemas.package import (PackageResponse, PaymentApprovalRequest,
+from ....schemas.package import (ApprovalStatsResponse, PackageResponse,
+                                PaymentApprovalRequest,
                                 PaymentRejectionRequest,
                                 PaymentStatus as SchemaPaymentStatus, 
                                 PaymentMethod as SchemaPaymentMethod)
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 from ....services.admin_service import AdminService
 
 router = APIRouter()
 
+# Instructor side of the admin user bookings join
+_instructor_user = aliased(User)
+
+
+def _serialize_user_bookings(rows) -> List[Dict[str, Any]]:
+    """Flatten (booking, class instance, template, instructor) rows for the admin view."""
+    bookings_data = []
+    for booking, class_instance, class_template, instructor in rows:
+
+        bookings_data.append({
+            "id": booking.id,
+            "booking_date": booking.created_at,
+            "status": booking.status.value,
+            "class_id": class_instance.id,
+            "class_name": class_template.name,
+            "class_description": class_template.description,
+            "class_date": class_instance.start_datetime,
+            "class_duration": class_template.duration_minutes,
+            "instructor_name": f"{instructor.first_name} {instructor.last_name}" if instructor else "TBA",
+            "location": getattr(class_template, 'location', 'TBA'),
+            "capacity": class_template.capacity,
+            "is_cancelled": booking.status == 'cancelled',
+            "cancelled_at": booking.cancellation_date,
+            "attended": booking.status == 'completed',
+            "no_show": booking.status == 'no_show',
+        })
+
+    return bookings_data
+
+
+def _payment_decision_columns() -> Tuple[Any, ...]:
+    """Columns approve/reject return from their UPDATE.
+
+    The user's email and package name come back as correlated subqueries, so
+    the decision needs no separate relationship loads.
+    """
+    return (
+        UserPackage.credits_remaining,
+        UserPackage.payment_status,
+        select(User.email)
+        .where(User.id == UserPackage.user_id)
+        .scalar_subquery()
+        .label("user_email"),
+        select(Package.name)
+        .where(Package.id == UserPackage.package_id)
+        .scalar_subquery()
+        .label("package_name"),
+    )
+
+
+def _encode_user_cursor(user: User) -> str:
+    """Encode a user's position in the admin user list as an opaque cursor."""
+    raw = f"{user.created_at.isoformat()}|{user.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_user_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by _encode_user_cursor."""
+    try:
+        created_at, user_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created_at), int(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
 
-@router.get("/users", response_model=List[UserListResponse])
+@router.get(
+    "/users", response_model=List[UserListResponse], response_class=ORJSONResponse
+)
 async def get_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     role: Optional[UserRole] = Query(None),
     active_only: Optional[bool] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
-    """Get all users with filtering options for admin management."""
-    admin_service = AdminService(db)
-    users = await admin_service.get_users(
-        skip=skip, limit=limit, search=search, role_filter=role, active_only=active_only
+    """Get all users with filtering options for admin management.
+
+    Prefer ``cursor`` over ``skip`` for paging: pass the ``X-Next-Cursor``
+    header of the previous page to continue after it.
+    """
+    rows = await admin_service.get_users(
+        skip=skip,
+        limit=limit,
+        search=search,
+        role_filter=role,
+        active_only=active_only,
+        after=_decode_user_cursor(cursor) if cursor else None,
     )
 
-    # Transform users to include additional stats
-    user_responses = []
-    for user in users:
-        # Count bookings and active packages (simplified for now)
-        total_bookings = len(user.bookings) if hasattr(user, "bookings") else 0
-        active_packages = (
-            len(
-                [
-                    pkg
-                    for pkg in user.user_packages
-                    if pkg.is_active and not pkg.is_expired
-                ]
-            )
-            if hasattr(user, "user_packages")
-            else 0
-        )
-
-        user_responses.append(
-            UserListResponse(
-                id=user.id,
-                email=user.email,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                role=user.role,
-                is_active=user.is_active,
-                is_verified=user.is_verified,
-                created_at=user.created_at,
-                total_bookings=total_bookings,
-                active_packages=active_packages,
-            )
-        )
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = _encode_user_cursor(rows[-1][0])
+
+    # Counts come back with each user row from a single query. Plain dicts,
+    # since response_model validates them once anyway
+    user_responses = [
+        {
+            "id": user.id,
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "role": user.role,
+            "is_active": user.is_active,
+            "is_verified": user.is_verified,
+            "created_at": user.created_at,
+            "total_bookings": total_bookings,
+            "active_packages": active_packages,
+        }
+        for user, total_bookings, active_packages in rows
+    ]
 
     return user_responses
 
@@ -81,11 +164,10 @@ async def update_user(
     user_id: int,
     user_update: UserUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Update user details."""
-    admin_service = AdminService(db)
 
     # Convert Pydantic model to dict, excluding None values
     update_data = user_update.model_dump(exclude_unset=True)
@@ -120,11 +202,10 @@ async def update_user(
 async def deactivate_user(
     user_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Deactivate a user account (soft delete)."""
-    admin_service = AdminService(db)
 
     try:
         await admin_service.deactivate_user(user_id, current_user, request)
@@ -133,7 +214,11 @@ async def deactivate_user(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
-@router.get("/users/{user_id}/packages")
+@router.get(
+    "/users/{user_id}/packages",
+    response_model=List[AdminUserPackageResponse],
+    response_class=ORJSONResponse,
+)
 async def get_user_packages(
     user_id: int,
     db: AsyncSession = Depends(get_db),
@@ -141,40 +226,19 @@ async def get_user_packages(
 ):
     """Get all packages for a specific user (admin only)."""
     try:
-        # Get user packages with package details
-        stmt = (
-            select(UserPackage)
-            .options(
-                selectinload(UserPackage.package),
-                selectinload(UserPackage.user)
-            )
+        # Get user packages with package details. Lambda statements may not
+        # call functions, so the loader options are resolved up front
+        loader_options = strict_loading_options()
+        stmt = lambda_stmt(
+            lambda: select(UserPackage)
+            .options(selectinload(UserPackage.package), *loader_options)
             .where(UserPackage.user_id == user_id)
             .order_by(UserPackage.created_at.desc())
         )
         result = await db.execute(stmt)
         user_packages = result.scalars().all()
 
-        packages_data = []
-        for user_package in user_packages:
-            packages_data.append({
-                "id": user_package.id,
-                "package_id": user_package.package_id,
-                "package_name": user_package.package.name,
-                "package_description": user_package.package.description,
-                "total_credits": user_package.package.credits,
-                "credits_remaining": user_package.credits_remaining,
-                "credits_used": user_package.package.credits - user_package.credits_remaining,
-                "price": float(user_package.package.price),
-                "status": user_package.status.value,
-                "is_active": user_package.is_active,
-                "is_expired": user_package.is_expired,
-                "purchased_at": user_package.created_at.isoformat(),
-                "expires_at": user_package.expiry_date.isoformat() if user_package.expiry_date else None,
-                "is_unlimited": user_package.package.is_unlimited,
-                "validity_days": user_package.package.validity_days,
-            })
-
-        return packages_data
+        return user_packages
 
     except Exception as e:
         raise HTTPException(
@@ -183,7 +247,7 @@ async def get_user_packages(
         )
 
 
-@router.get("/users/{user_id}/bookings")
+@router.get("/users/{user_id}/bookings", response_class=ORJSONResponse)
 async def get_user_bookings(
     user_id: int,
     db: AsyncSession = Depends(get_db),
@@ -195,45 +259,20 @@ async def get_user_bookings(
         from ....models.booking import Booking
         from ....models.class_schedule import ClassInstance, ClassTemplate
 
-        # Get user bookings with class details
-        stmt = (
-            select(Booking)
-            .options(
-                selectinload(Booking.class_instance).selectinload(ClassInstance.template),
-                selectinload(Booking.class_instance).selectinload(ClassInstance.instructor),
-                selectinload(Booking.user)
-            )
+        # Get user bookings with class details as flat rows in one query
+        stmt = lambda_stmt(
+            lambda: select(Booking, ClassInstance, ClassTemplate, _instructor_user)
+            .join(ClassInstance, Booking.class_instance_id == ClassInstance.id)
+            .join(ClassTemplate, ClassInstance.template_id == ClassTemplate.id)
+            .outerjoin(_instructor_user, ClassInstance.instructor_id == _instructor_user.id)
             .where(Booking.user_id == user_id)
             .order_by(Booking.created_at.desc())
         )
         result = await db.execute(stmt)
-        bookings = result.scalars().all()
-
-        bookings_data = []
-        for booking in bookings:
-            class_instance = booking.class_instance
-            class_template = class_instance.template
-            instructor = class_instance.instructor
-
-            bookings_data.append({
-                "id": booking.id,
-                "booking_date": booking.created_at.isoformat(),
-                "status": booking.status.value,
-                "class_id": class_instance.id,
-                "class_name": class_template.name,
-                "class_description": class_template.description,
-                "class_date": class_instance.start_datetime.isoformat(),
-                "class_duration": class_template.duration_minutes,
-                "instructor_name": f"{instructor.first_name} {instructor.last_name}" if instructor else "TBA",
-                "location": getattr(class_template, 'location', 'TBA'),
-                "capacity": class_template.capacity,
-                "is_cancelled": booking.status == 'cancelled',
-                "cancelled_at": booking.cancellation_date.isoformat() if booking.cancellation_date else None,
-                "attended": booking.status == 'completed',
-                "no_show": booking.status == 'no_show',
-            })
-
-        return bookings_data
+
+        # Rows are fully loaded, so building the dicts needs no I/O and can
+        # run off the event loop for users with long booking histories
+        return await run_in_threadpool(_serialize_user_bookings, result.all())
 
     except Exception as e:
         raise HTTPException(
@@ -242,31 +281,88 @@ async def get_user_bookings(
         )
 
 
+@router.get(
+    "/audit-logs", response_model=List[AuditLogRead], response_class=ORJSONResponse
+)
+async def get_audit_logs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    resource_type: Optional[str] = Query(None),
+    resource_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    admin_service: AdminService = Depends(get_admin_service),
+    current_user: User = Depends(get_admin_user),
+):
+    """Get audit log entries, optionally narrowed to one resource or user."""
+    return await admin_service.get_audit_logs(
+        skip=skip,
+        limit=limit,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        user_id=user_id,
+    )
+
+
 @router.get("/analytics/dashboard", response_model=DashboardAnalytics)
 async def get_dashboard_analytics(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_admin_user)
+    request: Request,
+    response: Response,
+    admin_service: AdminService = Depends(get_admin_service),
+    current_user: User = Depends(get_admin_user),
 ):
-    """Get key metrics for admin dashboard."""
-    admin_service = AdminService(db)
+    """Get key metrics for admin dashboard.
+
+    Responses carry an ETag of the metrics; polling clients that send it back
+    in If-None-Match get an empty 304 while the numbers are unchanged.
+    """
     analytics = await admin_service.get_dashboard_analytics()
-    return DashboardAnalytics(**analytics)
+
+    payload = json.dumps(analytics, sort_keys=True, default=str).encode("utf-8")
+    etag = f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return analytics
 
 
 @router.post("/packages", response_model=PackageResponse)
 async def create_package(
     package_data: PackageCreate,
     request: Request,
+    idempotency_key: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Create a new package."""
-    admin_service = AdminService(db)
+
+    # Scope the client's key to this admin and endpoint before storing it
+    stored_key = (
+        hash_token(f"{current_user.id}:create_package:{idempotency_key}")
+        if idempotency_key
+        else None
+    )
 
     # Create package
-    package = Package(**package_data.model_dump())
+    package = Package(**package_data.model_dump(), idempotency_key=stored_key)
     db.add(package)
-    await db.commit()
-    await db.refresh(package)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        if stored_key is None:
+            raise
+        # A retry of a request that already created the package
+        existing = await db.scalar(
+            select(Package).where(Package.idempotency_key == stored_key)
+        )
+        if existing is None:
+            raise
+        return existing
+
+    await invalidate_admin_dashboard_cache()
 
     # Log the action
     await admin_service.log_action(
@@ -278,7 +374,7 @@ async def create_package(
         request,
     )
 
-    return PackageResponse.model_validate(package)
+    return package
 
 
 @router.patch("/packages/{package_id}", response_model=PackageResponse)
@@ -287,71 +383,86 @@ async def update_package(
     package_update: PackageUpdate,
     request: Request,
     db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Update a package."""
-    admin_service = AdminService(db)
 
-    stmt = select(Package).where(Package.id == package_id)
-    result = await db.execute(stmt)
-    package = result.scalar_one_or_none()
+    update_data = package_update.model_dump(exclude_unset=True)
+    expected_version = update_data.pop("version", None)
+
+    if update_data:
+        # One statement: lock and snapshot the columns being changed, update
+        # the row and return both, so the audit log still gets the old values.
+        # PackageUpdate forbids unknown fields, so every key is a package column
+        old_package = (
+            select(Package.id, *(getattr(Package, key) for key in update_data))
+            .where(Package.id == package_id)
+            .with_for_update()
+            .cte("old_package")
+            .prefix_with("MATERIALIZED")
+        )
+        stmt = update(Package).where(Package.id == old_package.c.id)
+        if expected_version is not None:
+            stmt = stmt.where(Package.version == expected_version)
+        stmt = (
+            stmt.values(**update_data, version=Package.version + 1)
+            .returning(Package, *(old_package.c[key] for key in update_data))
+            .execution_options(populate_existing=True)
+        )
+        row = (await db.execute(stmt)).one_or_none()
+        package = row[0] if row else None
+        old_values = dict(zip(update_data, row[1:])) if row else {}
+    else:
+        package = await db.get(Package, package_id)
+        old_values = {}
 
     if not package:
+        if expected_version is not None and await db.get(Package, package_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Package was modified by another request",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Package not found"
         )
 
-    update_data = package_update.model_dump(exclude_unset=True)
-    old_values = {key: getattr(package, key) for key in update_data.keys()}
-
-    for key, value in update_data.items():
-        if hasattr(package, key):
-            setattr(package, key, value)
-
     await db.commit()
-    await db.refresh(package)
+    await invalidate_admin_dashboard_cache()
 
     # Log the action
     await admin_service.log_action(
         current_user,
         "UPDATE_PACKAGE",
         "Package",
-        package_id,
+        package.id,
         {"old_values": old_values, "new_values": update_data},
         request,
     )
 
-    return PackageResponse.model_validate(package)
+    return package
 
 
 @router.delete("/packages/{package_id}")
 async def delete_package(
-    package_id: int,
     request: Request,
     db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
+    package: Package = Depends(get_package_or_404),
 ):
     """Delete a package (soft delete by deactivating)."""
-    admin_service = AdminService(db)
-
-    stmt = select(Package).where(Package.id == package_id)
-    result = await db.execute(stmt)
-    package = result.scalar_one_or_none()
-
-    if not package:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Package not found"
-        )
 
     package.is_active = False
     await db.commit()
+    await invalidate_admin_dashboard_cache()
 
     # Log the action
     await admin_service.log_action(
         current_user,
         "DELETE_PACKAGE",
         "Package",
-        package_id,
+        package.id,
         {"package_name": package.name},
         request,
     )
@@ -363,11 +474,10 @@ async def delete_package(
 async def get_revenue_report(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Get revenue report for specified date range."""
-    admin_service = AdminService(db)
     report = await admin_service.get_revenue_report(start_date, end_date)
     return RevenueReport(**report)
 
@@ -376,86 +486,105 @@ async def get_revenue_report(
 async def get_attendance_report(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Get attendance report for specified date range."""
-    admin_service = AdminService(db)
     report = await admin_service.get_attendance_report(start_date, end_date)
     return AttendanceReport(**report)
 
 
+@router.get(
+    "/packages/approval-stats",
+    response_class=ORJSONResponse,
+    responses={200: {"model": ApprovalStatsResponse}},
+)
+async def get_approval_stats(
+    admin_service: AdminService = Depends(get_admin_service),
+    current_user: User = Depends(get_admin_user),
+):
+    """Get counters for the package payment approval queue."""
+    # The counters are built by our own query and polled often, so they are
+    # returned as-is; the model only documents the shape in the schema
+    return ORJSONResponse(await admin_service.get_approval_stats())
+
+
 @router.post("/packages/{package_id}/approve")
 async def approve_package_payment(
     package_id: int,
     approval_data: PaymentApprovalRequest,
     request: Request,
     db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Approve a pending package payment (simplified version)."""
     try:
-        # Get the package
+        values = UserPackage.confirmation_values(
+            current_user.id,
+            approval_data.payment_reference,
+            approval_data.admin_notes,
+        )
+
+        # Transition only a still-pending payment, so concurrent approvals
+        # can't both succeed
         stmt = (
-            select(UserPackage)
-            .options(
-                selectinload(UserPackage.user),
-                selectinload(UserPackage.package)
+            update(UserPackage)
+            .where(
+                and_(
+                    UserPackage.id == package_id,
+                    UserPackage.payment_status == PaymentStatus.PENDING,
+                )
             )
-            .where(UserPackage.id == package_id)
+            .values(**values)
+            .returning(*_payment_decision_columns())
+            .execution_options(synchronize_session=False)
         )
         result = await db.execute(stmt)
-        user_package = result.scalar_one_or_none()
+        user_package = result.one_or_none()
 
         if not user_package:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Package not found"
-            )
-
-        # Check if package can be approved
-        if user_package.payment_status == PaymentStatus.CONFIRMED:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Package payment is already confirmed"
+            current_status = await db.scalar(
+                select(UserPackage.payment_status).where(UserPackage.id == package_id)
             )
-
-        # Approve the payment using existing method
-        success, message = user_package.confirm_payment(
-            admin_id=current_user.id,
-            payment_reference=approval_data.payment_reference,
-            admin_notes=approval_data.admin_notes
-        )
-
-        if not success:
+            if current_status is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Package not found"
+                )
+            if current_status == PaymentStatus.CONFIRMED:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Package payment is already confirmed"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=message
+                detail="Payment was rejected and cannot be confirmed"
             )
 
-        await db.commit()
-
-        # Log the admin action
-        admin_service = AdminService(db)
+        # Log the admin action; the audit row commits together with the decision
         await admin_service.log_action(
             current_user,
             "APPROVE_PACKAGE_PAYMENT",
             "UserPackage",
             package_id,
             {
-                "user_email": user_package.user.email,
-                "package_name": user_package.package.name,
+                "user_email": user_package.user_email,
+                "package_name": user_package.package_name,
                 "payment_reference": approval_data.payment_reference,
                 "admin_notes": approval_data.admin_notes,
             },
             request,
         )
+        await admin_service.flush_audit_logs()
+        await invalidate_admin_approval_stats_cache()
+        await invalidate_admin_dashboard_cache()
 
         return {
             "message": "Package payment approved successfully",
             "user_package_id": package_id,
-            "user_email": user_package.user.email,
-            "package_name": user_package.package.name,
+            "user_email": user_package.user_email,
+            "package_name": user_package.package_name,
             "credits_available": user_package.credits_remaining,
             "payment_status": user_package.payment_status.value,
         }
@@ -476,28 +605,11 @@ async def reject_package_payment(
     rejection_data: PaymentRejectionRequest,
     request: Request,
     db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Reject a pending package payment (simplified version)."""
     try:
-        # Get the package
-        stmt = (
-            select(UserPackage)
-            .options(
-                selectinload(UserPackage.user),
-                selectinload(UserPackage.package)
-            )
-            .where(UserPackage.id == package_id)
-        )
-        result = await db.execute(stmt)
-        user_package = result.scalar_one_or_none()
-
-        if not user_package:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Package not found"
-            )
-
         # Validate rejection reason
         if not rejection_data.rejection_reason or not rejection_data.rejection_reason.strip():
             raise HTTPException(
@@ -505,49 +617,65 @@ async def reject_package_payment(
                 detail="Rejection reason is required"
             )
 
-        # Check if package can be rejected
-        if user_package.payment_status not in [PaymentStatus.PENDING]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Package payment cannot be rejected (status: {user_package.payment_status.value})"
-            )
+        values = UserPackage.rejection_values(
+            current_user.id,
+            rejection_data.rejection_reason,
+            rejection_data.admin_notes,
+        )
 
-        # Reject the payment using existing method
-        success, message = user_package.reject_payment(
-            admin_id=current_user.id,
-            rejection_reason=rejection_data.rejection_reason.strip(),
-            admin_notes=rejection_data.admin_notes
+        # Transition only a still-pending payment, so it can't race an approval
+        stmt = (
+            update(UserPackage)
+            .where(
+                and_(
+                    UserPackage.id == package_id,
+                    UserPackage.payment_status == PaymentStatus.PENDING,
+                )
+            )
+            .values(**values)
+            .returning(*_payment_decision_columns())
+            .execution_options(synchronize_session=False)
         )
+        result = await db.execute(stmt)
+        user_package = result.one_or_none()
 
-        if not success:
+        if not user_package:
+            current_status = await db.scalar(
+                select(UserPackage.payment_status).where(UserPackage.id == package_id)
+            )
+            if current_status is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Package not found"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=message
+                detail=f"Package payment cannot be rejected (status: {current_status.value})"
             )
 
-        await db.commit()
-
-        # Log the admin action
-        admin_service = AdminService(db)
+        # Log the admin action; the audit row commits together with the decision
         await admin_service.log_action(
             current_user,
             "REJECT_PACKAGE_PAYMENT",
             "UserPackage",
             package_id,
             {
-                "user_email": user_package.user.email,
-                "package_name": user_package.package.name,
+                "user_email": user_package.user_email,
+                "package_name": user_package.package_name,
                 "rejection_reason": rejection_data.rejection_reason,
                 "admin_notes": rejection_data.admin_notes,
             },
             request,
         )
+        await admin_service.flush_audit_logs()
+        await invalidate_admin_approval_stats_cache()
+        await invalidate_admin_dashboard_cache()
 
         return {
             "message": "Package payment rejected successfully",
             "user_package_id": package_id,
-            "user_email": user_package.user.email,
-            "package_name": user_package.package.name,
+            "user_email": user_package.user_email,
+            "package_name": user_package.package_name,
             "rejection_reason": rejection_data.rejection_reason,
             "payment_status": user_package.payment_status.value,
         }
@@ -567,6 +695,7 @@ async def create_announcement(
     announcement_data: CreateAnnouncementRequest,
     request: Request,
     db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Create a new system announcement."""
@@ -589,7 +718,6 @@ async def create_announcement(
         await db.refresh(announcement)
         
         # Log the admin action
-        admin_service = AdminService(db)
         await admin_service.log_action(
             current_user,
             "CREATE_ANNOUNCEMENT",
@@ -615,150 +743,13 @@ async def create_announcement(
 
 @router.get("/dashboard/metrics", response_model=DashboardMetrics)
 async def get_dashboard_metrics(
-    db: AsyncSession = Depends(get_db),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(get_admin_user),
 ):
     """Get admin dashboard metrics."""
-    from datetime import datetime, timedelta
-    from sqlalchemy import and_, desc, extract, func
-    from ....models.booking import Booking
-    from ....models.class_schedule import ClassInstance, ClassTemplate
-    from ....models.booking import WaitlistEntry
-    
     try:
-        # Calculate weekly capacity utilization
-        one_week_ago = datetime.now() - timedelta(days=7)
-        
-        # Get total capacity and bookings for the past week
-        capacity_stmt = (
-            select(
-                func.sum(ClassInstance.actual_capacity).label('total_capacity'),
-                func.count(Booking.id).label('total_bookings')
-            )
-            .select_from(ClassInstance)
-            .outerjoin(Booking)
-            .where(
-                and_(
-                    ClassInstance.start_datetime >= one_week_ago,
-                    ClassInstance.start_datetime <= datetime.now(),
-                    ClassInstance.status == 'scheduled'
-                )
-            )
-        )
-        
-        capacity_result = await db.execute(capacity_stmt)
-        capacity_data = capacity_result.first()
-        
-        total_capacity = capacity_data.total_capacity or 0
-        total_bookings = capacity_data.total_bookings or 0
-        
-        weekly_utilization = (total_bookings / total_capacity * 100) if total_capacity > 0 else 0
-        
-        # Get active users count (users with bookings in last 30 days)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        
-        active_users_stmt = (
-            select(func.count(func.distinct(Booking.user_id)))
-            .where(
-                and_(
-                    Booking.created_at >= thirty_days_ago,
-                    Booking.status == 'confirmed'
-                )
-            )
-        )
-        
-        active_users_result = await db.execute(active_users_stmt)
-        active_users_count = active_users_result.scalar() or 0
-        
-        # Calculate growth (compare to previous 30 days)
-        sixty_days_ago = datetime.now() - timedelta(days=60)
-        
-        prev_active_users_stmt = (
-            select(func.count(func.distinct(Booking.user_id)))
-            .where(
-                and_(
-                    Booking.created_at >= sixty_days_ago,
-                    Booking.created_at < thirty_days_ago,
-                    Booking.status == 'confirmed'
-                )
-            )
-        )
-        
-        prev_active_users_result = await db.execute(prev_active_users_stmt)
-        prev_active_users_count = prev_active_users_result.scalar() or 0
-        
-        user_growth = active_users_count - prev_active_users_count
-        
-        # Get today's classes
-        today = datetime.now().date()
-        today_classes_stmt = (
-            select(ClassInstance, ClassTemplate)
-            .join(ClassTemplate)
-            .where(
-                and_(
-                    func.date(ClassInstance.start_datetime) == today,
-                    ClassInstance.status == 'scheduled'
-                )
-            )
-            .order_by(ClassInstance.start_datetime)
-        )
-        
-        today_classes_result = await db.execute(today_classes_stmt)
-        today_classes_data = today_classes_result.all()
-        
-        today_classes = []
-        for class_instance, template in today_classes_data:
-            # Count current bookings for this class
-            bookings_count_stmt = (
-                select(func.count(Booking.id))
-                .where(
-                    and_(
-                        Booking.class_instance_id == class_instance.id,
-                        Booking.status == 'confirmed'
-                    )
-                )
-            )
-            bookings_count_result = await db.execute(bookings_count_stmt)
-            current_bookings = bookings_count_result.scalar() or 0
-            
-            # Count waitlist
-            waitlist_count_stmt = (
-                select(func.count(WaitlistEntry.id))
-                .where(WaitlistEntry.class_instance_id == class_instance.id)
-            )
-            waitlist_count_result = await db.execute(waitlist_count_stmt)
-            waitlist_count = waitlist_count_result.scalar() or 0
-            
-            today_classes.append({
-                "id": class_instance.id,
-                "class_name": template.name,
-                "start_time": class_instance.start_datetime.strftime("%H:%M"),
-                "end_time": class_instance.end_datetime.strftime("%H:%M"),
-                "current_bookings": current_bookings,
-                "capacity": class_instance.actual_capacity or template.capacity,
-                "waitlist_count": waitlist_count,
-                "status": class_instance.status,
-            })
-        
-        # Get waitlist notifications (classes with waitlists)
-        waitlist_notifications = []
-        for class_data in today_classes:
-            if class_data["waitlist_count"] > 0:
-                waitlist_notifications.append({
-                    "class_id": class_data["id"],
-                    "class_name": class_data["class_name"],
-                    "start_time": class_data["start_time"],
-                    "waitlist_count": class_data["waitlist_count"],
-                })
-        
-        return DashboardMetrics(
-            weekly_capacity_utilization=round(weekly_utilization, 1),
-            active_users_count=active_users_count,
-            active_users_growth=user_growth,
-            today_classes=today_classes,
-            waitlist_notifications=waitlist_notifications,
-        )
-        
+        # Today's class list changes at midnight, so the day is part of the key
+        return await admin_service.get_dashboard_metrics(datetime.now().date())
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -775,5 +766,4 @@ async def get_dashboard_metrics(
 # - authorize_package_payment (requires PaymentApproval model)
 # - confirm_package_payment (requires PaymentApproval model)
 # - revoke_package_authorization (requires PaymentApproval model)
-# - get_approval_stats (requires approval tracking)
 # - admin_cancel_package (working but simplified)
\ No newline at end of file
@@ -2,16 +2,18 @@ from datetime import datetime, timedelta, timezone
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_, select
+from sqlalchemy import and_, lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from ....core.cache import invalidate_admin_dashboard_cache
 from ....models.package import Package, UserPackage, UserPackageStatus, PaymentStatus, PaymentMethod as ModelPaymentMethod
 from ....models.user import User
 from ....schemas.package import (PackageCreate, PackagePurchase,
                                  PackageResponse, PackageUpdate,
                                  UserPackageResponse, PaymentMethod)
-from ..deps import get_admin_user, get_current_active_user, get_db
+from ..deps import (get_admin_user, get_current_active_user, get_db,
+                    get_package_or_404)
 
 router = APIRouter()
 
@@ -122,10 +124,11 @@ async def get_user_packages(
     current_user: User = Depends(get_current_active_user),
 ):
     """Get current user's packages separated by active, pending, and historical."""
-    stmt = (
-        select(UserPackage)
+    user_id = current_user.id
+    stmt = lambda_stmt(
+        lambda: select(UserPackage)
         .options(selectinload(UserPackage.package))
-        .where(UserPackage.user_id == current_user.id)
+        .where(UserPackage.user_id == user_id)
         .order_by(UserPackage.created_at.desc())
     )
     result = await db.execute(stmt)
@@ -208,7 +211,7 @@ async def create_package(
 
     db.add(db_package)
     await db.commit()
-    await db.refresh(db_package)
+    await invalidate_admin_dashboard_cache()
 
     return db_package
 
@@ -221,21 +224,35 @@ async def update_package(
     admin_user: User = Depends(get_admin_user),
 ):
     """Update a package (admin only)."""
-    stmt = select(Package).where(Package.id == package_id)
-    result = await db.execute(stmt)
-    package = result.scalar_one_or_none()
+    update_data = package_update.dict(exclude_unset=True)
+    expected_version = update_data.pop("version", None)
+
+    if update_data:
+        # Single UPDATE ... RETURNING instead of SELECT, UPDATE and refresh;
+        # the version check makes it a compare-and-swap
+        stmt = update(Package).where(Package.id == package_id)
+        if expected_version is not None:
+            stmt = stmt.where(Package.version == expected_version)
+        stmt = stmt.values(**update_data, version=Package.version + 1).returning(
+            Package
+        )
+        result = await db.execute(stmt)
+        package = result.scalar_one_or_none()
+    else:
+        package = await db.get(Package, package_id)
 
     if not package:
+        if expected_version is not None and await db.get(Package, package_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Package was modified by another request",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Package not found"
         )
 
-    update_data = package_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(package, field, value)
-
     await db.commit()
-    await db.refresh(package)
+    await invalidate_admin_dashboard_cache()
 
     return package
 
@@ -259,42 +276,25 @@ async def get_package_catalog(
 
 @router.delete("/{package_id}")
 async def delete_package(
-    package_id: int,
     db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_admin_user),
+    package: Package = Depends(get_package_or_404),
 ):
     """Delete a package (admin only)."""
-    stmt = select(Package).where(Package.id == package_id)
-    result = await db.execute(stmt)
-    package = result.scalar_one_or_none()
-
-    if not package:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Package not found"
-        )
-
     await db.delete(package)
     await db.commit()
+    await invalidate_admin_dashboard_cache()
 
     return {"message": "Package deleted successfully"}
 
 
 @router.patch("/{package_id}/toggle")
 async def toggle_package_status(
-    package_id: int,
     db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_admin_user),
+    package: Package = Depends(get_package_or_404),
 ):
     """Toggle package active status (admin only)."""
-    stmt = select(Package).where(Package.id == package_id)
-    result = await db.execute(stmt)
-    package = result.scalar_one_or_none()
-
-    if not package:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Package not found"
-        )
-
     package.is_active = not package.is_active
     await db.commit()
 
@@ -21,7 +21,8 @@ from ....schemas.payment import (ConfirmPaymentRequest,
                                  RefundRequest, RefundResponse,
                                  SubscriptionRequest, SubscriptionResponse)
 from ....services.stripe_service import StripeService
-from ..deps import get_admin_user, get_current_active_user, get_db
+from ..deps import (get_admin_user, get_current_active_user,
+                    get_current_user_with_profile, get_db)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -34,7 +35,7 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 async def create_payment_intent(
     request: CreatePaymentIntentRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_with_profile),
 ):
     """Create a payment intent for package purchase."""
     try:
@@ -369,7 +370,7 @@ async def confirm_cash_payment(
 @router.get("/methods", response_model=List[PaymentMethodResponse])
 async def get_payment_methods(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_with_profile),
 ):
     """Get saved payment methods for current user."""
     try:
@@ -460,7 +461,7 @@ async def request_refund(
 async def remove_payment_method(
     method_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_with_profile),
 ):
     """Remove a saved payment method."""
     try:
@@ -562,7 +563,7 @@ async def get_invoice(
 async def create_subscription(
     request: SubscriptionRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_with_profile),
 ):
     """Create monthly unlimited subscription."""
     try:
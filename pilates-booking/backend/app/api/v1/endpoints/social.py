@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ....core.cache import invalidate_auth_user_cache
 from ....core.database import get_db
 from ....core.deps import get_current_user
 from ....models import User
@@ -232,5 +233,6 @@ async def update_privacy_settings(
     """Update user privacy settings."""
     current_user.privacy_settings = settings.dict()
     await db.commit()
+    await invalidate_auth_user_cache(current_user.id)
     
     return {"success": True, "privacy_settings": current_user.privacy_settings}
\ No newline at end of file
@@ -4,22 +4,24 @@ from pathlib import Path
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy import func, select
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ....core.cache import invalidate_auth_user_cache
 from ....models.booking import Booking, BookingStatus
 from ....models.class_schedule import ClassInstance
 from ....models.user import User
 from ....schemas.user import (UserPreferences, UserResponse, UserStats,
                               UserUpdate, ExtendedUserStats, Announcement)
-from ..deps import get_admin_user, get_current_active_user, get_db
+from ..deps import (get_admin_user, get_current_active_user,
+                    get_current_user_with_profile, get_db)
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_with_profile),
 ):
     """Get current user profile."""
     return current_user
@@ -39,6 +41,7 @@ async def update_current_user_profile(
 
     await db.commit()
     await db.refresh(current_user)
+    await invalidate_auth_user_cache(current_user.id)
 
     return current_user
 
@@ -121,13 +124,14 @@ async def upload_avatar(
     # Update user avatar path
     current_user.avatar_url = f"/uploads/avatars/{unique_filename}"
     await db.commit()
+    await invalidate_auth_user_cache(current_user.id)
 
     return {"avatar_url": current_user.avatar_url}
 
 
 @router.get("/me/stats", response_model=UserStats)
 async def get_user_stats(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_with_profile),
     db: AsyncSession = Depends(get_db),
 ):
     """Get user booking statistics."""
@@ -179,7 +183,7 @@ async def get_user_stats(
 
 @router.get("/me/stats/extended", response_model=ExtendedUserStats)
 async def get_extended_user_stats(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_with_profile),
     db: AsyncSession = Depends(get_db),
 ):
     """Get extended user statistics with streaks and detailed metrics."""
@@ -354,6 +358,7 @@ async def update_user_preferences(
     preferences_dict = preferences.dict()
     current_user.preferences = preferences_dict
     await db.commit()
+    await invalidate_auth_user_cache(current_user.id)
 
     return preferences
 
@@ -366,17 +371,16 @@ async def get_booking_history(
     db: AsyncSession = Depends(get_db),
 ):
     """Get user's booking history."""
-    from sqlalchemy import select
     from sqlalchemy.orm import selectinload
 
-    stmt = (
-        select(Booking)
-        .where(Booking.user_id == current_user.id)
+    user_id = current_user.id
+    stmt = lambda_stmt(
+        lambda: select(Booking)
+        .where(Booking.user_id == user_id)
         .options(selectinload(Booking.class_instance))
         .order_by(Booking.created_at.desc())
-        .offset(skip)
-        .limit(limit)
     )
+    stmt += lambda s: s.offset(skip).limit(limit)
 
     result = await db.execute(stmt)
     bookings = result.scalars().all()
@@ -1,10 +1,13 @@
 """
 Redis caching service for frequently accessed data.
 """
+import functools
 import json
 import pickle
-from typing import Any, Optional, Union, Dict, List
-from datetime import timedelta
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Union, Dict, List, Tuple
+from datetime import date, datetime, timedelta
 
 import redis.asyncio as redis
 from redis.asyncio import Redis
@@ -17,6 +20,8 @@ class CacheService:
     
     def __init__(self):
         self._redis_client: Optional[Redis] = None
+        # Monotonic time until which Redis is skipped after a failure
+        self._unavailable_until = 0.0
         
     async def get_client(self) -> Redis:
         """Get or create Redis client."""
@@ -25,13 +30,23 @@ class CacheService:
                 settings.REDIS_URL,
                 encoding="utf-8",
                 decode_responses=False,  # We handle encoding ourselves
-                socket_connect_timeout=5,
-                socket_timeout=5,
-                retry_on_timeout=True,
+                socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT_SECONDS,
+                socket_timeout=settings.CACHE_SOCKET_TIMEOUT_SECONDS,
                 health_check_interval=30
             )
         return self._redis_client
     
+    def is_available(self) -> bool:
+        """Whether Redis should be tried, i.e. it has not failed recently."""
+        return time.monotonic() >= self._unavailable_until
+    
+    def _record_failure(self, error: Exception) -> None:
+        """Skip Redis for a while when it cannot be reached."""
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self._unavailable_until = (
+                time.monotonic() + settings.CACHE_RETRY_AFTER_SECONDS
+            )
+    
     async def close(self):
         """Close Redis connection."""
         if self._redis_client:
@@ -53,6 +68,9 @@ class CacheService:
             ttl: Time to live in seconds or timedelta
             serialize_method: "json" or "pickle"
         """
+        if not self.is_available():
+            return False
+
         try:
             client = await self.get_client()
             
@@ -70,6 +88,7 @@ class CacheService:
                 
             return await client.set(key, serialized_value, ex=ttl)
         except Exception as e:
+            self._record_failure(e)
             # Log error but don't fail - graceful degradation
             print(f"Cache set error for key {key}: {e}")
             return False
@@ -86,6 +105,9 @@ class CacheService:
             key: Cache key
             serialize_method: "json" or "pickle"
         """
+        if not self.is_available():
+            return None
+
         try:
             client = await self.get_client()
             cached_value = await client.get(key)
@@ -102,16 +124,22 @@ class CacheService:
                 raise ValueError(f"Unknown serialize_method: {serialize_method}")
                 
         except Exception as e:
+            self._record_failure(e)
             # Log error but don't fail - graceful degradation
             print(f"Cache get error for key {key}: {e}")
             return None
     
     async def delete(self, key: str) -> bool:
-        """Delete a key from cache."""
+        """Delete a key from cache.
+        
+        Deletes are tried even while Redis is being skipped, so an
+        invalidation is not lost when it comes back early.
+        """
         try:
             client = await self.get_client()
             return bool(await client.delete(key))
         except Exception as e:
+            self._record_failure(e)
             print(f"Cache delete error for key {key}: {e}")
             return False
     
@@ -124,15 +152,20 @@ class CacheService:
                 return await client.delete(*keys)
             return 0
         except Exception as e:
+            self._record_failure(e)
             print(f"Cache delete pattern error for pattern {pattern}: {e}")
             return 0
     
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
+        if not self.is_available():
+            return False
+
         try:
             client = await self.get_client()
             return bool(await client.exists(key))
         except Exception as e:
+            self._record_failure(e)
             print(f"Cache exists error for key {key}: {e}")
             return False
     
@@ -143,6 +176,9 @@ class CacheService:
         serialize_method: str = "json"
     ) -> bool:
         """Set multiple key-value pairs."""
+        if not self.is_available():
+            return False
+
         try:
             client = await self.get_client()
             
@@ -170,6 +206,7 @@ class CacheService:
             return all(results)
             
         except Exception as e:
+            self._record_failure(e)
             print(f"Cache set_many error: {e}")
             return False
     
@@ -179,6 +216,9 @@ class CacheService:
         serialize_method: str = "json"
     ) -> Dict[str, Any]:
         """Get multiple values by keys."""
+        if not self.is_available():
+            return {}
+
         try:
             client = await self.get_client()
             values = await client.mget(keys)
@@ -196,6 +236,7 @@ class CacheService:
             return result
             
         except Exception as e:
+            self._record_failure(e)
             print(f"Cache get_many error: {e}")
             return {}
 
@@ -233,6 +274,41 @@ class CacheKeys:
     def weekly_schedule(year: int, week: int) -> str:
         """Generate cache key for weekly class schedule."""
         return f"weekly_schedule:{year}:{week}"
+    
+    @staticmethod
+    def auth_user(user_id: int) -> str:
+        """Generate cache key for the authenticated user snapshot.
+        
+        Bump the version suffix whenever the cached column set changes so
+        entries written by older code are ignored.
+        """
+        return f"auth_user:{user_id}:v2"
+    
+    @staticmethod
+    def admin_dashboard() -> str:
+        """Generate cache key for the admin dashboard analytics."""
+        return "admin:dash:v1"
+    
+    @staticmethod
+    def admin_dashboard_metrics(day: date) -> str:
+        """Generate cache key for the admin dashboard metrics of one day."""
+        return f"admin:dash_metrics:{day.isoformat()}:v1"
+    
+    @staticmethod
+    def admin_report(
+        report: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> str:
+        """Generate cache key for an admin report over a date range."""
+        start = start_date.isoformat() if start_date else "default"
+        end = end_date.isoformat() if end_date else "default"
+        return f"admin:report:{report}:{start}:{end}:v1"
+
+    @staticmethod
+    def admin_approval_stats() -> str:
+        """Generate cache key for the package payment approval counters."""
+        return "admin:approval_stats:v1"
 
 
 # Cache decorators for common use cases
@@ -243,6 +319,7 @@ def cache_result(
 ):
     """Decorator to cache function results."""
     def decorator(func):
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
             cache_key = key_func(*args, **kwargs)
@@ -280,4 +357,53 @@ async def invalidate_class_cache(class_id: int):
     ]
     
     for pattern in patterns:
-        await cache.delete_pattern(pattern)
\ No newline at end of file
+        await cache.delete_pattern(pattern)
+
+
+# Per-worker copy of auth snapshots in front of Redis, kept as JSON bytes so
+# every request gets its own objects: user_id -> (expires_at, payload)
+_local_auth_users: "OrderedDict[int, Tuple[float, bytes]]" = OrderedDict()
+
+
+def get_local_auth_user(user_id: int) -> Optional[Dict[str, Any]]:
+    """Return this worker's auth snapshot for a user if it is still fresh."""
+    entry = _local_auth_users.get(user_id)
+    if entry is None:
+        return None
+
+    expires_at, payload = entry
+    if expires_at < time.monotonic():
+        _local_auth_users.pop(user_id, None)
+        return None
+
+    return json.loads(payload)
+
+
+def set_local_auth_user(user_id: int, columns: Dict[str, Any]) -> None:
+    """Store an auth snapshot in this worker, evicting the oldest entries."""
+    _local_auth_users[user_id] = (
+        time.monotonic() + settings.AUTH_USER_LOCAL_CACHE_TTL_SECONDS,
+        json.dumps(columns).encode("utf-8"),
+    )
+    _local_auth_users.move_to_end(user_id)
+    while len(_local_auth_users) > settings.AUTH_USER_LOCAL_CACHE_SIZE:
+        _local_auth_users.popitem(last=False)
+
+
+async def invalidate_auth_user_cache(user_id: int):
+    """Drop the cached auth snapshot after a user's row changes.
+
+    Other workers keep their local copy until its short TTL runs out.
+    """
+    _local_auth_users.pop(user_id, None)
+    await cache.delete(CacheKeys.auth_user(user_id))
+
+
+async def invalidate_admin_dashboard_cache():
+    """Drop the cached admin dashboard analytics."""
+    await cache.delete(CacheKeys.admin_dashboard())
+
+
+async def invalidate_admin_approval_stats_cache():
+    """Drop the cached approval counters after a payment is approved or rejected."""
+    await cache.delete(CacheKeys.admin_approval_stats())
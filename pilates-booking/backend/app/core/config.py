@@ -14,6 +14,10 @@ class Settings(BaseSettings):
     
     # Redis - NO defaults for production safety  
     REDIS_URL: str
+    # The cache sits on every authenticated request, so give up on Redis
+    # quickly and fall back to the database, then leave it alone for a while
+    CACHE_SOCKET_TIMEOUT_SECONDS: float = 0.25
+    CACHE_RETRY_AFTER_SECONDS: int = 30
 
     # Security - Generate secure defaults but require override in production
     SECRET_KEY: str = ""
@@ -48,14 +52,35 @@ class Settings(BaseSettings):
     CANCELLATION_HOURS_LIMIT: int = 2
     WAITLIST_AUTO_PROMOTION: bool = True
 
+    # Seconds an authenticated user's row is cached (kept well below token expiry)
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    # In-process copy per worker; short so changes made via other workers show quickly
+    AUTH_USER_LOCAL_CACHE_TTL_SECONDS: int = 5
+    AUTH_USER_LOCAL_CACHE_SIZE: int = 10000
+    # Seconds the admin dashboard analytics and metrics are cached; the dashboard polls
+    ADMIN_DASHBOARD_CACHE_TTL_SECONDS: int = 45
+    # Revenue/attendance reports cover whole days, so they can be staler
+    ADMIN_REPORT_CACHE_TTL_SECONDS: int = 300
+    # Approval counters are polled by every open admin view; keep them fresh
+    # enough that new purchases show up quickly
+    ADMIN_APPROVAL_STATS_CACHE_TTL_SECONDS: int = 20
+
     # Timezone
     DEFAULT_TIMEZONE: str = "Asia/Jerusalem"
 
-    # Database connection pool settings
-    DB_POOL_SIZE: int = 10
-    DB_MAX_OVERFLOW: int = 20
+    # Database connection pool settings; keep most capacity in the persistent
+    # pool since overflow connections are opened and closed per burst
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 1800
+    # Compiled SQL kept per engine; sized above the number of distinct statements
+    DB_QUERY_CACHE_SIZE: int = 1200
+    # Prepared statements asyncpg keeps per connection (SQLAlchemy default 100)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    # Make relationship access that a query didn't eager-load raise instead of
+    # lazy loading row by row; meant for development and CI
+    DB_STRICT_LOADING: bool = False
 
     # Stripe Configuration - Required, no defaults
     STRIPE_SECRET_KEY: str = ""
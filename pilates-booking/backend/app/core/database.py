@@ -2,6 +2,7 @@ from sqlalchemy import MetaData
 from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
                                     create_async_engine)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import raiseload
 
 from .config import settings
 
@@ -12,7 +13,10 @@ connect_args = {}
 # Handle different database types
 if "postgresql" in db_url:
     db_url = db_url.replace("postgresql://", "postgresql+asyncpg://")
-    connect_args = {"server_settings": {"jit": "off"}}
+    connect_args = {
+        "server_settings": {"jit": "off"},
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
 elif "sqlite" in db_url:
     connect_args = {"check_same_thread": False}
 
@@ -21,6 +25,7 @@ engine_kwargs = {
     "echo": settings.DEBUG,
     "future": True,
     "connect_args": connect_args,
+    "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
 }
 
 # Only apply connection pooling for PostgreSQL, not SQLite
@@ -91,6 +96,15 @@ class SafeBase(SafeReprMixin):
 Base = declarative_base(metadata=metadata, cls=SafeBase)
 
 
+def strict_loading_options() -> tuple:
+    """Loader options to append after a query's eager loads.
+
+    With DB_STRICT_LOADING on, touching a relationship the query didn't load
+    raises instead of issuing a lazy load per row.
+    """
+    return (raiseload("*"),) if settings.DB_STRICT_LOADING else ()
+
+
 async def get_db():
     """Get database session dependency."""
     async with AsyncSessionLocal() as session:
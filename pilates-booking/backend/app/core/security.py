@@ -47,8 +47,8 @@ def create_refresh_token(
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return subject."""
+def verify_token(token: str) -> Optional[int]:
+    """Verify JWT token and return the subject as a user id."""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -59,8 +59,8 @@ def verify_token(token: str) -> Optional[str]:
         if token_data is None:
             return None
 
-        return token_data
-    except JWTError:
+        return int(token_data)
+    except (JWTError, TypeError, ValueError):
         return None
 
 
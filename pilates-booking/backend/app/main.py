@@ -7,6 +7,7 @@ from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.v1.api import api_router
+from .api.v1.deps import close_redis
 from .core.config import settings
 from .core.database import engine, init_db
 from .core.database_logging import setup_database_logging
@@ -60,6 +61,8 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis") and app.state.redis:
         app.state.redis.close()
 
+    await close_redis()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
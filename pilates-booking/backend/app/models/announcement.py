@@ -2,7 +2,8 @@ import enum
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import (JSON, Boolean, Column, DateTime, Index, Integer, String,
+                        Text, text)
 from sqlalchemy.sql import func
 
 from ..core.database import Base
@@ -17,6 +18,16 @@ class AnnouncementType(str, enum.Enum):
 
 class Announcement(Base):
     __tablename__ = "announcements"
+    __table_args__ = (
+        # Serves the "visible announcements, newest first" query: the partial
+        # predicate matches its filter and expires_at is checked from the index
+        Index(
+            "ix_announcements_visible",
+            text("created_at DESC"),
+            postgresql_include=["expires_at"],
+            postgresql_where=text("is_active = true AND deleted_at IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
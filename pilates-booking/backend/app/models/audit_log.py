@@ -1,7 +1,8 @@
 import enum
 
-from sqlalchemy import (JSON, Column, DateTime, Enum, ForeignKey, Integer,
-                        String, Text)
+from sqlalchemy import (JSON, Column, DateTime, Enum, ForeignKey, Index,
+                        Integer, String, Text, text)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -70,6 +71,22 @@ class SecurityLevel(str, enum.Enum):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Containment lookups on the payload, e.g. details @> '{"package_id": 5}'
+        Index(
+            "ix_audit_logs_details",
+            "details",
+            postgresql_using="gin",
+            postgresql_ops={"details": "jsonb_path_ops"},
+        ),
+        # Recent history of one resource, newest first
+        Index(
+            "ix_audit_logs_resource_timestamp",
+            "resource_type",
+            "resource_id",
+            text('"timestamp" DESC'),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -79,7 +96,7 @@ class AuditLog(Base):
     resource_type = Column(String(50), nullable=True)
     resource_id = Column(Integer, nullable=True)
     security_level = Column(Enum(SecurityLevel), default=SecurityLevel.LOW)
-    details = Column(JSON, nullable=True)
+    details = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
     request_id = Column(String(36), nullable=True)  # UUID for request tracking
@@ -1,8 +1,8 @@
 import enum
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import (Boolean, Column, DateTime, Enum, ForeignKey, Integer,
-                        Numeric, String, Text, CheckConstraint)
+from sqlalchemy import (Boolean, Column, DateTime, Enum, ForeignKey, Index,
+                        Integer, Numeric, String, Text, CheckConstraint, text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -46,6 +46,10 @@ class Package(Base):
     is_featured = Column(
         Boolean, default=False, nullable=False
     )  # For highlighting packages
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # For optimistic locking
+    idempotency_key = Column(
+        String(64), unique=True, nullable=True
+    )  # Hash of the Idempotency-Key the package was created with
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -56,12 +60,28 @@ class Package(Base):
         "UserPackage", back_populates="package", cascade="all, delete-orphan"
     )
 
+    # Fetch created_at/updated_at with RETURNING at flush instead of a refresh,
+    # and have every ORM UPDATE check and bump the row version
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version}
+
     def __repr__(self):
         return f"<Package(id={self.id}, name='{self.name}', credits={self.credits})>"
 
 
 class UserPackage(Base):
     __tablename__ = "user_packages"
+    __table_args__ = (
+        CheckConstraint(
+            "payment_status IN ('pending', 'confirmed', 'rejected')",
+            name="payment_status",
+        ),
+        CheckConstraint(
+            "status IN ('active', 'expired', 'cancelled')",
+            name="status",
+        ),
+        # A user's packages, newest first
+        Index("ix_user_packages_user_created", "user_id", text("created_at DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -70,10 +90,12 @@ class UserPackage(Base):
     purchase_date = Column(DateTime(timezone=True), server_default=func.now())
     expiry_date = Column(DateTime(timezone=True), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
-    status = Column(Enum(UserPackageStatus, name='userpackagestatus', values_callable=lambda x: [e.value for e in x]), default=UserPackageStatus.ACTIVE, nullable=False)
+    # Stored as VARCHAR + CHECK constraint (not a native enum) so new values
+    # don't require ALTER TYPE migrations
+    status = Column(Enum(UserPackageStatus, native_enum=False, length=32, values_callable=lambda x: [e.value for e in x]), default=UserPackageStatus.ACTIVE, nullable=False)
     
     # Payment tracking fields
-    payment_status = Column(Enum(PaymentStatus, name='userpackagepaymentstatus', values_callable=lambda x: [e.value for e in x]), default=PaymentStatus.CONFIRMED, nullable=False)
+    payment_status = Column(Enum(PaymentStatus, native_enum=False, length=32, values_callable=lambda x: [e.value for e in x]), default=PaymentStatus.CONFIRMED, nullable=False)
     payment_method = Column(Enum(PaymentMethod, name='paymentmethod', values_callable=lambda x: [e.value for e in x]), default=PaymentMethod.CREDIT_CARD, nullable=False)
     
     # Simple approval fields
@@ -172,6 +194,39 @@ class UserPackage(Base):
             self.credits_remaining += 1
         return True
 
+    @staticmethod
+    def confirmation_values(admin_id: int, payment_reference: str = None, admin_notes: str = None) -> dict:
+        """Column values recording a confirmed payment.
+
+        Shared by confirm_payment() and the admin endpoint's guarded UPDATE.
+        """
+        values = {
+            "payment_status": PaymentStatus.CONFIRMED,
+            "approved_by": admin_id,
+            "approved_at": datetime.now(timezone.utc),
+        }
+        if payment_reference:
+            values["payment_reference"] = payment_reference
+        if admin_notes:
+            values["admin_notes"] = admin_notes
+        return values
+
+    @staticmethod
+    def rejection_values(admin_id: int, rejection_reason: str, admin_notes: str = None) -> dict:
+        """Column values recording a rejected payment.
+
+        Shared by reject_payment() and the admin endpoint's guarded UPDATE.
+        """
+        values = {
+            "payment_status": PaymentStatus.REJECTED,
+            "approved_by": admin_id,
+            "approved_at": datetime.now(timezone.utc),
+            "rejection_reason": rejection_reason.strip(),
+        }
+        if admin_notes:
+            values["admin_notes"] = admin_notes.strip()
+        return values
+
     def confirm_payment(self, admin_id: int, payment_reference: str = None, admin_notes: str = None) -> tuple[bool, str]:
         """Confirm cash payment. Returns (success, message)."""
         if self.payment_status == PaymentStatus.CONFIRMED:
@@ -180,14 +235,8 @@ class UserPackage(Base):
         if self.payment_status == PaymentStatus.REJECTED:
             return False, "Payment was rejected and cannot be confirmed"
             
-        self.payment_status = PaymentStatus.CONFIRMED
-        self.approved_by = admin_id
-        self.approved_at = datetime.now(timezone.utc)
-        
-        if payment_reference:
-            self.payment_reference = payment_reference
-        if admin_notes:
-            self.admin_notes = admin_notes
+        for key, value in self.confirmation_values(admin_id, payment_reference, admin_notes).items():
+            setattr(self, key, value)
             
         return True, "Payment confirmed successfully"
 
@@ -202,13 +251,8 @@ class UserPackage(Base):
         if not rejection_reason or not rejection_reason.strip():
             return False, "Rejection reason is required"
             
-        self.payment_status = PaymentStatus.REJECTED
-        self.approved_by = admin_id
-        self.approved_at = datetime.now(timezone.utc)
-        self.rejection_reason = rejection_reason.strip()
-        
-        if admin_notes:
-            self.admin_notes = admin_notes.strip()
+        for key, value in self.rejection_values(admin_id, rejection_reason, admin_notes).items():
+            setattr(self, key, value)
             
         return True, "Payment rejected successfully"
 
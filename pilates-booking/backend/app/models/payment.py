@@ -1,7 +1,7 @@
 import enum
 
-from sqlalchemy import (Column, DateTime, Enum, ForeignKey, Integer, Numeric,
-                        String, Text)
+from sqlalchemy import (Column, DateTime, Enum, ForeignKey, Index, Integer,
+                        Numeric, String, Text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -34,6 +34,15 @@ class PaymentType(str, enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Finding the pending cash payment behind a package reservation
+        Index(
+            "ix_payments_user_package_method_status",
+            "user_package_id",
+            "payment_method",
+            "status",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
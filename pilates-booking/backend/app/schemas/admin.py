@@ -1,8 +1,10 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import (AliasPath, BaseModel, ConfigDict, EmailStr, Field,
+                      computed_field)
 
+from ..models.package import UserPackageStatus
 from ..models.user import UserRole
 from .user import UserResponse
 
@@ -32,6 +34,34 @@ class UserListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AdminUserPackageResponse(BaseModel):
+    """A user's package as listed in the admin user view, read from a UserPackage."""
+
+    id: int
+    package_id: int
+    package_name: str = Field(validation_alias=AliasPath("package", "name"))
+    package_description: Optional[str] = Field(
+        validation_alias=AliasPath("package", "description")
+    )
+    total_credits: int = Field(validation_alias=AliasPath("package", "credits"))
+    credits_remaining: int
+    price: float = Field(validation_alias=AliasPath("package", "price"))
+    status: UserPackageStatus
+    is_active: bool
+    is_expired: bool
+    purchased_at: datetime = Field(validation_alias="created_at")
+    expires_at: Optional[datetime] = Field(validation_alias="expiry_date")
+    is_unlimited: bool = Field(validation_alias=AliasPath("package", "is_unlimited"))
+    validity_days: int = Field(validation_alias=AliasPath("package", "validity_days"))
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def credits_used(self) -> int:
+        return self.total_credits - self.credits_remaining
+
+
 class PackageCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -50,6 +80,9 @@ class PackageUpdate(BaseModel):
     is_unlimited: Optional[bool] = None
     validity_days: Optional[int] = None
     is_active: Optional[bool] = None
+    version: Optional[int] = None  # Version the client last read; stale updates get 409
+
+    model_config = ConfigDict(extra="forbid")
 
 
 class DashboardAnalytics(BaseModel):
@@ -97,9 +130,9 @@ class AttendanceReport(BaseModel):
 
 class AuditLogRead(BaseModel):
     id: int
-    user_id: int
+    user_id: Optional[int]
     action: str
-    resource_type: str
+    resource_type: Optional[str]
     resource_id: Optional[int]
     details: Optional[Dict[str, Any]]
     ip_address: Optional[str]
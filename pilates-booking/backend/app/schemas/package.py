@@ -47,6 +47,9 @@ class PackageUpdate(BaseModel):
     validity_days: Optional[int] = None
     is_unlimited: Optional[bool] = None
     is_active: Optional[bool] = None
+    version: Optional[int] = None  # Version the client last read; stale updates get 409
+
+    model_config = {"extra": "forbid"}
 
 
 class PackagePurchase(BaseModel):
@@ -58,6 +61,7 @@ class PackagePurchase(BaseModel):
 class PackageResponse(PackageBase):
     id: int
     is_active: bool
+    version: int
     created_at: datetime
     updated_at: datetime
 
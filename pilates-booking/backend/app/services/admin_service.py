@@ -1,17 +1,21 @@
 import json
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import Request
-from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy import and_, desc, func, literal_column, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from ..core.cache import (CacheKeys, cache_result,
+                          invalidate_admin_dashboard_cache,
+                          invalidate_auth_user_cache)
+from ..core.config import settings
 from ..models.audit_log import AuditLog
-from ..models.booking import Booking
-from ..models.class_schedule import ClassInstance
+from ..models.booking import Booking, WaitlistEntry
+from ..models.class_schedule import ClassInstance, ClassTemplate
 from ..models.package import Package, UserPackage
+from ..models.package import PaymentStatus as PackagePaymentStatus
 from ..models.payment import Payment, PaymentStatus
 from ..models.transaction import Transaction
 from ..models.user import User, UserRole
@@ -20,6 +24,7 @@ from ..models.user import User, UserRole
 class AdminService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self._pending_audit_logs: List[AuditLog] = []
 
     @staticmethod
     def _sanitize_for_json(obj: Any) -> Any:
@@ -44,7 +49,11 @@ class AdminService:
         details: Optional[Dict[str, Any]] = None,
         request: Optional[Request] = None,
     ):
-        """Log an admin action for audit purposes."""
+        """Queue an admin action for the audit log.
+
+        Entries are written together by flush_audit_logs(), which the
+        get_admin_service dependency calls once the endpoint has succeeded.
+        """
         ip_address = None
         user_agent = None
 
@@ -65,7 +74,19 @@ class AdminService:
             user_agent=user_agent,
         )
 
-        self.db.add(audit_log)
+        self._pending_audit_logs.append(audit_log)
+
+    async def flush_audit_logs(self) -> None:
+        """Write all queued audit entries in one INSERT and commit.
+
+        Endpoints whose change must commit together with its audit row call
+        this instead of committing themselves.
+        """
+        if not self._pending_audit_logs:
+            return
+
+        self.db.add_all(self._pending_audit_logs)
+        self._pending_audit_logs = []
         await self.db.commit()
 
     async def get_users(
@@ -75,19 +96,47 @@ class AdminService:
         search: Optional[str] = None,
         role_filter: Optional[UserRole] = None,
         active_only: Optional[bool] = None,
-    ) -> List[User]:
-        """Get users with filters for admin management."""
-        query = select(User).options(
-            selectinload(User.user_packages), selectinload(User.bookings)
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Tuple[User, int, int]]:
+        """Get users with their booking and active package counts for admin management.
+
+        Pass ``after`` as the (created_at, id) of the last user on the previous
+        page to paginate by keyset; ``skip`` is ignored in that case.
+        """
+        total_bookings = (
+            select(func.count())
+            .where(Booking.user_id == User.id)
+            .correlate(User)
+            .scalar_subquery()
+        )
+        active_packages = (
+            select(func.count())
+            .where(
+                and_(
+                    UserPackage.user_id == User.id,
+                    UserPackage.is_active == True,
+                    UserPackage.expiry_date >= func.now(),
+                )
+            )
+            .correlate(User)
+            .scalar_subquery()
+        )
+        query = select(
+            User,
+            total_bookings.label("total_bookings"),
+            active_packages.label("active_packages"),
         )
 
         if search:
-            search_filter = or_(
-                User.first_name.ilike(f"%{search}%"),
-                User.last_name.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%"),
+            # Served by the ix_users_search_trgm trigram index
+            search_text = func.lower(
+                User.email
+                + literal_column("' '")
+                + User.first_name
+                + literal_column("' '")
+                + User.last_name
             )
-            query = query.where(search_filter)
+            query = query.where(search_text.like(f"%{search.lower()}%"))
 
         if role_filter:
             query = query.where(User.role == role_filter)
@@ -95,10 +144,15 @@ class AdminService:
         if active_only is not None:
             query = query.where(User.is_active == active_only)
 
-        query = query.order_by(User.created_at.desc()).offset(skip).limit(limit)
+        if after is not None:
+            query = query.where(tuple_(User.created_at, User.id) < after)
+        else:
+            query = query.offset(skip)
+
+        query = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit)
 
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return result.all()
 
     async def update_user(
         self,
@@ -123,6 +177,7 @@ class AdminService:
 
         await self.db.commit()
         await self.db.refresh(user)
+        await invalidate_auth_user_cache(user_id)
 
         await self.log_action(
             admin_user,
@@ -149,6 +204,8 @@ class AdminService:
         user.is_active = False
         await self.db.commit()
         await self.db.refresh(user)
+        await invalidate_auth_user_cache(user_id)
+        await invalidate_admin_dashboard_cache()
 
         await self.log_action(
             admin_user,
@@ -161,21 +218,25 @@ class AdminService:
 
         return user
 
+    @cache_result(
+        lambda self: CacheKeys.admin_dashboard(),
+        ttl=settings.ADMIN_DASHBOARD_CACHE_TTL_SECONDS,
+    )
     async def get_dashboard_analytics(self) -> Dict[str, Any]:
         """Get key metrics for admin dashboard."""
         # Total users
-        total_users_stmt = select(func.count(User.id))
+        total_users_stmt = select(func.count()).select_from(User)
         total_users = await self.db.scalar(total_users_stmt)
 
         # Active users (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        active_users_stmt = select(func.count(User.id)).where(
+        active_users_stmt = select(func.count()).where(
             User.created_at >= thirty_days_ago
         )
         active_users = await self.db.scalar(active_users_stmt)
 
         # Total bookings
-        total_bookings_stmt = select(func.count(Booking.id))
+        total_bookings_stmt = select(func.count()).select_from(Booking)
         total_bookings = await self.db.scalar(total_bookings_stmt)
 
         # Total revenue (from completed payments only)
@@ -219,6 +280,156 @@ class AdminService:
             "popular_packages": popular_packages,
         }
 
+    @cache_result(
+        lambda self, day: CacheKeys.admin_dashboard_metrics(day),
+        ttl=settings.ADMIN_DASHBOARD_CACHE_TTL_SECONDS,
+    )
+    async def get_dashboard_metrics(self, day: date) -> Dict[str, Any]:
+        """Get capacity, activity and today's schedule for the admin dashboard."""
+        # Calculate weekly capacity utilization
+        one_week_ago = datetime.now() - timedelta(days=7)
+        
+        # Get total capacity and bookings for the past week
+        capacity_stmt = (
+            select(
+                func.sum(ClassInstance.actual_capacity).label('total_capacity'),
+                func.count(Booking.id).label('total_bookings')
+            )
+            .select_from(ClassInstance)
+            .outerjoin(Booking)
+            .where(
+                and_(
+                    ClassInstance.start_datetime >= one_week_ago,
+                    ClassInstance.start_datetime <= datetime.now(),
+                    ClassInstance.status == 'scheduled'
+                )
+            )
+        )
+        
+        capacity_result = await self.db.execute(capacity_stmt)
+        capacity_data = capacity_result.first()
+        
+        total_capacity = capacity_data.total_capacity or 0
+        total_bookings = capacity_data.total_bookings or 0
+        
+        weekly_utilization = (total_bookings / total_capacity * 100) if total_capacity > 0 else 0
+        
+        # Get active users count (users with bookings in last 30 days)
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        
+        active_users_stmt = (
+            select(func.count(func.distinct(Booking.user_id)))
+            .where(
+                and_(
+                    Booking.created_at >= thirty_days_ago,
+                    Booking.status == 'confirmed'
+                )
+            )
+        )
+        
+        active_users_result = await self.db.execute(active_users_stmt)
+        active_users_count = active_users_result.scalar() or 0
+        
+        # Calculate growth (compare to previous 30 days)
+        sixty_days_ago = datetime.now() - timedelta(days=60)
+        
+        prev_active_users_stmt = (
+            select(func.count(func.distinct(Booking.user_id)))
+            .where(
+                and_(
+                    Booking.created_at >= sixty_days_ago,
+                    Booking.created_at < thirty_days_ago,
+                    Booking.status == 'confirmed'
+                )
+            )
+        )
+        
+        prev_active_users_result = await self.db.execute(prev_active_users_stmt)
+        prev_active_users_count = prev_active_users_result.scalar() or 0
+        
+        user_growth = active_users_count - prev_active_users_count
+        
+        # Get today's classes, as a start_datetime range the index can serve
+        today_start = datetime.combine(day, datetime.min.time())
+        today_end = today_start + timedelta(days=1)
+        # Booking and waitlist counts come back with each class instead of
+        # two extra queries per class
+        current_bookings = (
+            select(func.count())
+            .where(
+                and_(
+                    Booking.class_instance_id == ClassInstance.id,
+                    Booking.status == 'confirmed'
+                )
+            )
+            .correlate(ClassInstance)
+            .scalar_subquery()
+        )
+        waitlist_count = (
+            select(func.count())
+            .where(WaitlistEntry.class_instance_id == ClassInstance.id)
+            .correlate(ClassInstance)
+            .scalar_subquery()
+        )
+        today_classes_stmt = (
+            select(
+                ClassInstance,
+                ClassTemplate,
+                current_bookings.label('current_bookings'),
+                waitlist_count.label('waitlist_count'),
+            )
+            .join(ClassTemplate)
+            .where(
+                and_(
+                    ClassInstance.start_datetime >= today_start,
+                    ClassInstance.start_datetime < today_end,
+                    ClassInstance.status == 'scheduled'
+                )
+            )
+            .order_by(ClassInstance.start_datetime)
+        )
+        
+        today_classes_result = await self.db.execute(today_classes_stmt)
+        today_classes_data = today_classes_result.all()
+        
+        today_classes = []
+        for class_instance, template, bookings_count, waitlist_size in today_classes_data:
+            today_classes.append({
+                "id": class_instance.id,
+                "class_name": template.name,
+                "start_time": class_instance.start_datetime.strftime("%H:%M"),
+                "end_time": class_instance.end_datetime.strftime("%H:%M"),
+                "current_bookings": bookings_count or 0,
+                "capacity": class_instance.actual_capacity or template.capacity,
+                "waitlist_count": waitlist_size or 0,
+                "status": class_instance.status,
+            })
+        
+        # Get waitlist notifications (classes with waitlists)
+        waitlist_notifications = []
+        for class_data in today_classes:
+            if class_data["waitlist_count"] > 0:
+                waitlist_notifications.append({
+                    "class_id": class_data["id"],
+                    "class_name": class_data["class_name"],
+                    "start_time": class_data["start_time"],
+                    "waitlist_count": class_data["waitlist_count"],
+                })
+
+        return {
+            "weekly_capacity_utilization": round(weekly_utilization, 1),
+            "active_users_count": active_users_count,
+            "active_users_growth": user_growth,
+            "today_classes": today_classes,
+            "waitlist_notifications": waitlist_notifications,
+        }
+
+    @cache_result(
+        lambda self, start_date=None, end_date=None: CacheKeys.admin_report(
+            "revenue", start_date, end_date
+        ),
+        ttl=settings.ADMIN_REPORT_CACHE_TTL_SECONDS,
+    )
     async def get_revenue_report(
         self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
@@ -296,6 +507,12 @@ class AdminService:
             "revenue_by_package": revenue_by_package,
         }
 
+    @cache_result(
+        lambda self, start_date=None, end_date=None: CacheKeys.admin_report(
+            "attendance", start_date, end_date
+        ),
+        ttl=settings.ADMIN_REPORT_CACHE_TTL_SECONDS,
+    )
     async def get_attendance_report(
         self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
@@ -348,3 +565,77 @@ class AdminService:
             "bookings_by_date": bookings_by_date,
             "popular_times": popular_times,
         }
+
+    @cache_result(
+        lambda self: CacheKeys.admin_approval_stats(),
+        ttl=settings.ADMIN_APPROVAL_STATS_CACHE_TTL_SECONDS,
+    )
+    async def get_approval_stats(self) -> Dict[str, Any]:
+        """Get package payment approval counters in a single scan."""
+        now = datetime.now(timezone.utc)
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        pending = UserPackage.payment_status == PackagePaymentStatus.PENDING
+        confirmed = UserPackage.payment_status == PackagePaymentStatus.CONFIRMED
+        rejected = UserPackage.payment_status == PackagePaymentStatus.REJECTED
+
+        stats_stmt = select(
+            func.count().filter(pending).label("total_pending"),
+            func.count()
+            .filter(and_(pending, UserPackage.created_at >= start_of_day))
+            .label("pending_today"),
+            func.count()
+            .filter(and_(pending, UserPackage.created_at < now - timedelta(hours=24)))
+            .label("pending_over_24h"),
+            # approved_at is only set when an admin acts on a payment
+            func.avg(
+                func.extract("epoch", UserPackage.approved_at - UserPackage.created_at)
+            )
+            .filter(confirmed)
+            .label("avg_approval_seconds"),
+            func.count()
+            .filter(and_(confirmed, UserPackage.approved_at >= start_of_day))
+            .label("total_approved_today"),
+            func.count()
+            .filter(and_(rejected, UserPackage.approved_at >= start_of_day))
+            .label("total_rejected_today"),
+        ).select_from(UserPackage)
+
+        stats = (await self.db.execute(stats_stmt)).one()
+
+        return {
+            "total_pending": stats.total_pending,
+            "pending_today": stats.pending_today,
+            "pending_over_24h": stats.pending_over_24h,
+            "avg_approval_time_hours": round(
+                float(stats.avg_approval_seconds or 0) / 3600, 1
+            ),
+            "total_approved_today": stats.total_approved_today,
+            "total_rejected_today": stats.total_rejected_today,
+        }
+
+    async def get_audit_logs(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> List[AuditLog]:
+        """Get audit log entries, newest first.
+
+        Admins see every entry, so no row-level filter is applied unless the
+        caller narrows the listing.
+        """
+        query = select(AuditLog)
+
+        if resource_type:
+            query = query.where(AuditLog.resource_type == resource_type)
+        if resource_id is not None:
+            query = query.where(AuditLog.resource_id == resource_id)
+        if user_id is not None:
+            query = query.where(AuditLog.user_id == user_id)
+
+        query = query.order_by(AuditLog.timestamp.desc()).offset(skip).limit(limit)
+
+        result = await self.db.execute(query)
+        return result.scalars().all()
@@ -5,6 +5,7 @@ from fastapi import HTTPException, Request, status
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.cache import invalidate_auth_user_cache
 from ..core.config import settings
 from ..core.logging_config import get_logger
 from ..core.security import (create_access_token, create_refresh_token,
@@ -398,6 +399,7 @@ class AuthService:
         user.is_verified = True
         user.verification_token = None
         await self.db.commit()
+        await invalidate_auth_user_cache(user.id)
         return True
 
     async def generate_password_reset_token(self, email: str) -> str:
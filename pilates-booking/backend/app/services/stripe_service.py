@@ -5,6 +5,7 @@ import stripe
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.cache import invalidate_auth_user_cache
 from ..core.config import settings
 from ..core.logging_config import get_logger
 from ..models.package import Package
@@ -64,6 +65,7 @@ class StripeService:
             # Update user with Stripe customer ID
             user.stripe_customer_id = customer.id
             await db.commit()
+            await invalidate_auth_user_cache(user.id)
 
             logger.info(
                 "Created new Stripe customer successfully",
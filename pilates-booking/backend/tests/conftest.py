@@ -4,7 +4,7 @@ Provides shared fixtures, database setup, and testing utilities.
 """
 
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import AsyncGenerator, Generator
 from unittest.mock import MagicMock
 
@@ -12,8 +12,10 @@ import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from sqlalchemy import DateTime, event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.pool import StaticPool
 
 # Override settings for testing before any app imports
@@ -64,6 +66,25 @@ async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
 app.dependency_overrides[get_db] = override_get_db
 
 
+def restore_utc_offsets(target, context, attrs=None):
+    """Give loaded timezone-aware columns back their UTC offset.
+
+    SQLite stores DateTime(timezone=True) values without an offset, while
+    PostgreSQL always returns them aware; models compare them to aware now().
+    """
+    for attr in inspect(target).mapper.column_attrs:
+        column_type = attr.columns[0].type
+        if not (isinstance(column_type, DateTime) and column_type.timezone):
+            continue
+        value = target.__dict__.get(attr.key)
+        if isinstance(value, datetime) and value.tzinfo is None:
+            set_committed_value(target, attr.key, value.replace(tzinfo=timezone.utc))
+
+
+event.listen(Base, "load", restore_utc_offsets, propagate=True)
+event.listen(Base, "refresh", restore_utc_offsets, propagate=True)
+
+
 @pytest_asyncio.fixture(scope="session")
 async def engine():
     """Create test database engine."""
@@ -274,6 +295,40 @@ def mock_redis():
     return mock
 
 
+@pytest.fixture(autouse=True)
+def clear_local_auth_cache():
+    """Keep per-worker auth snapshots from leaking between tests that reuse user ids."""
+    from app.core.cache import _local_auth_users
+
+    _local_auth_users.clear()
+    yield
+    _local_auth_users.clear()
+
+
+@pytest_asyncio.fixture
+async def clean_tables(engine, setup_database):
+    """Run a test against empty tables; the shared user fixtures commit."""
+
+    async def delete_all_rows():
+        async with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                await conn.execute(table.delete())
+
+    await delete_all_rows()
+    yield
+    await delete_all_rows()
+
+
+@pytest.fixture
+def use_test_database():
+    """Point the endpoints' own get_db at the test database as well."""
+    from app.api.v1 import deps
+
+    app.dependency_overrides[deps.get_db] = app.dependency_overrides[get_db]
+    yield
+    app.dependency_overrides.pop(deps.get_db, None)
+
+
 @pytest.fixture
 def mock_email_service():
     """Mock email service."""
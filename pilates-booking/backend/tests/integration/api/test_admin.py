@@ -0,0 +1,485 @@
+"""
+Integration tests for the admin API.
+Covers the admin user views, package management and approval endpoints.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from app.models.audit_log import AuditLog
+from app.models.package import Package, PaymentStatus, UserPackage
+from app.models.user import User
+
+
+pytestmark = pytest.mark.usefixtures("clean_tables", "use_test_database")
+
+
+async def create_package(db_session: AsyncSession, **overrides) -> Package:
+    """Create a package with sensible defaults."""
+    values = {
+        "name": "10 Class Pack",
+        "description": "Ten classes",
+        "credits": 10,
+        "price": 150.0,
+        "validity_days": 60,
+    }
+    values.update(overrides)
+    package = Package(**values)
+    db_session.add(package)
+    await db_session.commit()
+    await db_session.refresh(package)
+    return package
+
+
+async def create_user_package(
+    db_session: AsyncSession, user: User, package: Package, **overrides
+) -> UserPackage:
+    """Give a user a package, pending payment by default."""
+    values = {
+        "user_id": user.id,
+        "package_id": package.id,
+        "credits_remaining": package.credits,
+        "expiry_date": datetime.now(timezone.utc) + timedelta(days=package.validity_days),
+        "payment_status": PaymentStatus.PENDING,
+    }
+    values.update(overrides)
+    user_package = UserPackage(**values)
+    db_session.add(user_package)
+    await db_session.commit()
+    await db_session.refresh(user_package)
+    return user_package
+
+
+class TestAdminUserViews:
+    """Test the admin views of a single user."""
+
+    @pytest.mark.asyncio
+    async def test_get_user_packages(
+        self, client, db_session, admin_headers, test_user
+    ):
+        """Test listing a user's packages with package details."""
+        package = await create_package(db_session)
+        await create_user_package(db_session, test_user, package, credits_remaining=7)
+
+        response = client.get(
+            f"/api/v1/admin/users/{test_user.id}/packages", headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["package_name"] == "10 Class Pack"
+        assert data[0]["total_credits"] == 10
+        assert data[0]["credits_remaining"] == 7
+        assert data[0]["credits_used"] == 3
+
+    @pytest.mark.asyncio
+    async def test_get_user_packages_is_empty_for_other_users(
+        self, client, db_session, admin_headers, admin_user, test_user
+    ):
+        """Test that only the requested user's packages are listed."""
+        package = await create_package(db_session)
+        await create_user_package(db_session, test_user, package)
+
+        response = client.get(
+            f"/api/v1/admin/users/{admin_user.id}/packages", headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+class TestAdminDashboard:
+    """Test the admin dashboard endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_dashboard_analytics(
+        self, client, db_session, admin_headers, test_user
+    ):
+        """Test the dashboard analytics and their ETag revalidation."""
+        package = await create_package(db_session)
+        await create_user_package(db_session, test_user, package)
+
+        response = client.get("/api/v1/admin/analytics/dashboard", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_users"] == 2
+        assert data["popular_packages"] == [{"name": "10 Class Pack", "count": 1}]
+
+        etag = response.headers["etag"]
+        response = client.get(
+            "/api/v1/admin/analytics/dashboard",
+            headers={**admin_headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_dashboard_metrics(self, client, admin_headers):
+        """Test the dashboard metrics on an empty schedule."""
+        response = client.get("/api/v1/admin/dashboard/metrics", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["weekly_capacity_utilization"] == 0
+        assert data["today_classes"] == []
+        assert data["waitlist_notifications"] == []
+
+
+class TestAdminUserList:
+    """Test paging through the admin user list."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages_cover_every_user_once(
+        self, client, db_session, admin_headers
+    ):
+        """Test that following X-Next-Cursor visits every user once, in order."""
+        base_time = datetime(2024, 1, 1, 12, 0, 0)
+        # Two users share a timestamp, so the id has to break the tie
+        for index, days_ago in enumerate([1, 2, 2, 3, 4]):
+            db_session.add(
+                User(
+                    email=f"member{index}@example.com",
+                    hashed_password="not-used",
+                    first_name="Member",
+                    last_name=str(index),
+                    created_at=base_time - timedelta(days=days_ago),
+                )
+            )
+        await db_session.commit()
+
+        full_list = client.get("/api/v1/admin/users", headers=admin_headers)
+        assert full_list.status_code == 200
+        expected_ids = [user["id"] for user in full_list.json()]
+        assert len(expected_ids) == 6
+
+        seen_ids = []
+        params = {"limit": 2}
+        for _ in range(len(expected_ids)):
+            response = client.get(
+                "/api/v1/admin/users", params=params, headers=admin_headers
+            )
+            assert response.status_code == 200
+            seen_ids.extend(user["id"] for user in response.json())
+            next_cursor = response.headers.get("x-next-cursor")
+            if next_cursor is None:
+                break
+            params = {"limit": 2, "cursor": next_cursor}
+
+        assert seen_ids == expected_ids
+
+    def test_invalid_cursor(self, client, admin_headers):
+        """Test that a malformed cursor is rejected."""
+        response = client.get(
+            "/api/v1/admin/users",
+            params={"cursor": "not-a-cursor"},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 400
+
+
+class TestAuditLogs:
+    """Test the admin audit log listing."""
+
+    @pytest.mark.asyncio
+    async def test_list_audit_logs(
+        self, client, db_session, admin_headers, admin_user, test_user
+    ):
+        """Test that entries are listed newest first and can be narrowed."""
+        base_time = datetime(2024, 1, 1, 12, 0, 0)
+        entries = [
+            ("CREATE_PACKAGE", "Package", 1, admin_user.id, 3),
+            ("UPDATE_PACKAGE", "Package", 1, admin_user.id, 2),
+            ("UPDATE_PACKAGE", "Package", 2, admin_user.id, 1),
+            ("LOGIN_SUCCESS", "User", test_user.id, test_user.id, 0),
+        ]
+        for action, resource_type, resource_id, user_id, days_ago in entries:
+            db_session.add(
+                AuditLog(
+                    action=action,
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    user_id=user_id,
+                    timestamp=base_time - timedelta(days=days_ago),
+                )
+            )
+        await db_session.commit()
+
+        response = client.get("/api/v1/admin/audit-logs", headers=admin_headers)
+        assert response.status_code == 200
+        assert [log["action"] for log in response.json()] == [
+            "LOGIN_SUCCESS",
+            "UPDATE_PACKAGE",
+            "UPDATE_PACKAGE",
+            "CREATE_PACKAGE",
+        ]
+
+        response = client.get(
+            "/api/v1/admin/audit-logs",
+            params={"resource_type": "Package", "resource_id": 1},
+            headers=admin_headers,
+        )
+        assert [log["action"] for log in response.json()] == [
+            "UPDATE_PACKAGE",
+            "CREATE_PACKAGE",
+        ]
+
+        response = client.get(
+            "/api/v1/admin/audit-logs",
+            params={"user_id": test_user.id},
+            headers=admin_headers,
+        )
+        assert [log["action"] for log in response.json()] == ["LOGIN_SUCCESS"]
+
+        response = client.get(
+            "/api/v1/admin/audit-logs",
+            params={"skip": 1, "limit": 2},
+            headers=admin_headers,
+        )
+        assert [log["resource_id"] for log in response.json()] == [2, 1]
+
+    def test_list_audit_logs_requires_admin(self, client, auth_headers):
+        """Test that students cannot read the audit log."""
+        response = client.get("/api/v1/admin/audit-logs", headers=auth_headers)
+
+        assert response.status_code == 403
+
+
+class TestPaymentDecisions:
+    """Test approving and rejecting package payments."""
+
+    @pytest.mark.asyncio
+    async def test_approve_payment(
+        self, client, db_session, admin_headers, admin_user, test_user
+    ):
+        """Test that an approval confirms the payment and audits it."""
+        package = await create_package(db_session)
+        user_package = await create_user_package(db_session, test_user, package)
+
+        response = client.post(
+            f"/api/v1/admin/packages/{user_package.id}/approve",
+            json={"payment_reference": "CASH-1", "admin_notes": "Paid at desk"},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["payment_status"] == "confirmed"
+
+        await db_session.refresh(user_package)
+        assert user_package.payment_status == PaymentStatus.CONFIRMED
+        assert user_package.approved_by == admin_user.id
+        assert user_package.payment_reference == "CASH-1"
+
+        audit_logs = (await db_session.scalars(select(AuditLog))).all()
+        assert [log.action for log in audit_logs] == ["APPROVE_PACKAGE_PAYMENT"]
+        assert audit_logs[0].resource_id == user_package.id
+
+    @pytest.mark.asyncio
+    async def test_reject_payment(
+        self, client, db_session, admin_headers, test_user
+    ):
+        """Test that a rejection records the reason and audits it."""
+        package = await create_package(db_session)
+        user_package = await create_user_package(db_session, test_user, package)
+
+        response = client.post(
+            f"/api/v1/admin/packages/{user_package.id}/reject",
+            json={"rejection_reason": "  No payment received  "},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+
+        await db_session.refresh(user_package)
+        assert user_package.payment_status == PaymentStatus.REJECTED
+        assert user_package.rejection_reason == "No payment received"
+
+        audit_logs = (await db_session.scalars(select(AuditLog))).all()
+        assert [log.action for log in audit_logs] == ["REJECT_PACKAGE_PAYMENT"]
+
+    @pytest.mark.asyncio
+    async def test_approve_rejected_payment_fails(
+        self, client, db_session, admin_headers, test_user
+    ):
+        """Test that a decided payment is left alone and not audited."""
+        package = await create_package(db_session)
+        user_package = await create_user_package(
+            db_session, test_user, package, payment_status=PaymentStatus.REJECTED
+        )
+
+        response = client.post(
+            f"/api/v1/admin/packages/{user_package.id}/approve",
+            json={},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 400
+        assert (await db_session.scalars(select(AuditLog))).all() == []
+
+
+class TestApprovalStats:
+    """Test the package payment approval counters."""
+
+    @pytest.mark.asyncio
+    async def test_approval_stats_counts(
+        self, client, db_session, admin_headers, admin_user, test_user
+    ):
+        """Test the counters over pending, approved and rejected payments."""
+        now = datetime.now(timezone.utc)
+        package = await create_package(db_session)
+        decided = {"approved_by": admin_user.id}
+        for overrides in [
+            {"created_at": now},
+            {"created_at": now - timedelta(days=2)},
+            {
+                "payment_status": PaymentStatus.CONFIRMED,
+                "created_at": now - timedelta(days=1),
+                "approved_at": now,
+                **decided,
+            },
+            {
+                "payment_status": PaymentStatus.CONFIRMED,
+                "created_at": now - timedelta(days=3),
+                "approved_at": now - timedelta(days=2),
+                **decided,
+            },
+            {
+                "payment_status": PaymentStatus.REJECTED,
+                "created_at": now - timedelta(days=1),
+                "approved_at": now,
+                **decided,
+            },
+        ]:
+            await create_user_package(db_session, test_user, package, **overrides)
+
+        response = client.get(
+            "/api/v1/admin/packages/approval-stats", headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_pending"] == 2
+        assert data["pending_today"] == 1
+        assert data["pending_over_24h"] == 1
+        assert data["total_approved_today"] == 1
+        assert data["total_rejected_today"] == 1
+
+    def test_approval_stats_schema(self):
+        """Test that the documented response keeps the counters model."""
+        schema = app.openapi()
+        operation = schema["paths"]["/api/v1/admin/packages/approval-stats"]["get"]
+        content = operation["responses"]["200"]["content"]["application/json"]
+
+        assert content["schema"]["$ref"].endswith("/ApprovalStatsResponse")
+
+
+class TestPackageManagement:
+    """Test creating and updating packages."""
+
+    @pytest.mark.asyncio
+    async def test_create_package_replays_idempotency_key(
+        self, client, db_session, admin_headers
+    ):
+        """Test that a retried create returns the first package instead of a copy."""
+        headers = {**admin_headers, "Idempotency-Key": "create-10-pack"}
+        payload = {
+            "name": "10 Class Pack",
+            "description": "Ten classes",
+            "credits": 10,
+            "price": 150.0,
+            "validity_days": 60,
+        }
+
+        first = client.post("/api/v1/admin/packages", json=payload, headers=headers)
+        retry = client.post("/api/v1/admin/packages", json=payload, headers=headers)
+
+        assert first.status_code == 200
+        assert retry.status_code == 200
+        assert retry.json()["id"] == first.json()["id"]
+
+        count = await db_session.scalar(select(func.count()).select_from(Package))
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_create_package_without_idempotency_key(
+        self, client, db_session, admin_headers
+    ):
+        """Test that creates without a key are not deduplicated."""
+        payload = {
+            "name": "Drop-in",
+            "description": "One class",
+            "credits": 1,
+            "price": 20.0,
+            "validity_days": 30,
+        }
+
+        first = client.post("/api/v1/admin/packages", json=payload, headers=admin_headers)
+        second = client.post("/api/v1/admin/packages", json=payload, headers=admin_headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json()["id"] != first.json()["id"]
+
+    @pytest.mark.asyncio
+    async def test_update_package_rejects_unknown_fields(
+        self, client, db_session, admin_headers
+    ):
+        """Test that fields PackageUpdate does not declare get a 422."""
+        package = await create_package(db_session)
+
+        response = client.patch(
+            f"/api/v1/admin/packages/{package.id}",
+            json={"idempotency_key": "forged"},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_update_package_bumps_version(
+        self, client, db_session, admin_headers
+    ):
+        """Test that an update with the current version succeeds."""
+        package = await create_package(db_session)
+
+        response = client.patch(
+            f"/api/v1/admin/packages/{package.id}",
+            json={"price": 180.0, "version": package.version},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert float(data["price"]) == 180.0
+        assert data["version"] == package.version + 1
+
+    @pytest.mark.asyncio
+    async def test_update_package_with_stale_version(
+        self, client, db_session, admin_headers
+    ):
+        """Test that an update based on an old version gets a 409."""
+        package = await create_package(db_session)
+        stale_version = package.version
+
+        first = client.patch(
+            f"/api/v1/admin/packages/{package.id}",
+            json={"price": 180.0, "version": stale_version},
+            headers=admin_headers,
+        )
+        second = client.patch(
+            f"/api/v1/admin/packages/{package.id}",
+            json={"price": 120.0, "version": stale_version},
+            headers=admin_headers,
+        )
+
+        assert first.status_code == 200
+        assert second.status_code == 409
+
+        await db_session.refresh(package)
+        assert package.price == 180.0
+        assert package.version == stale_version + 1
@@ -183,6 +183,15 @@ class TestTokenSecurity:
             )
             assert response.status_code == 401
 
+    def test_non_numeric_token_subject(self, client):
+        """Test that a validly signed token with a non-numeric subject is rejected."""
+        token = create_access_token(subject="not-a-user-id")
+
+        response = client.get(
+            "/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+
 
 class TestInputValidation:
     """Test input validation and sanitization."""
@@ -0,0 +1,45 @@
+"""
+Integration tests for the user API.
+Covers the current user's profile, including requests served from the auth cache.
+"""
+
+import pytest
+
+from app.api.v1.deps import _auth_snapshot
+from app.core.cache import get_local_auth_user
+from app.models.user import UserRole
+
+pytestmark = pytest.mark.usefixtures("clean_tables", "use_test_database")
+
+
+class TestCurrentUserProfile:
+    """Test the current user's profile endpoints."""
+
+    def test_auth_cache_keeps_identity_fields_only(self, client, test_user, auth_headers):
+        """Test that only the identity fields are cached for authentication."""
+        response = client.get("/api/v1/users/me", headers=auth_headers)
+
+        assert response.status_code == 200
+        snapshot = get_local_auth_user(test_user.id)
+        assert snapshot == _auth_snapshot(test_user)
+        assert snapshot["role"] == UserRole.STUDENT.value
+
+    def test_get_profile_from_cached_user(self, client, test_user, auth_headers):
+        """Test that a cached user still gets the full profile back."""
+        first = client.get("/api/v1/users/me", headers=auth_headers)
+        assert get_local_auth_user(test_user.id) is not None
+
+        second = client.get("/api/v1/users/me", headers=auth_headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert second.json()["first_name"] == test_user.first_name
+
+    def test_user_stats_from_cached_user(self, client, auth_headers):
+        """Test that profile timestamps load for a cached user."""
+        client.get("/api/v1/users/me", headers=auth_headers)
+
+        response = client.get("/api/v1/users/me/stats", headers=auth_headers)
+
+        assert response.status_code == 200